@@ -1,7 +1,9 @@
+import argparse
 import pandas as pd
 import numpy as np
-import requests
-import re
+from fetching import make_session
+from http_cache import HttpCache, add_cache_arguments, cache_from_args
+from propublica_api import FilingTable, NameMemo, fetch_organizations, lookup_eins, organization_url
 
 # ein = "381686050"   #EIN for Credit Union
 # url = f"https://projects.propublica.org/nonprofits/api/v2/organizations/{ein}.json"
@@ -28,7 +30,13 @@ cu_list = [
     "Sound Credit Union",
     "VyStar Credit Union"
 ]
-all_cu_data = []
+
+# One pooled keep-alive session for every request. Search and organization
+# JSON is cached on disk and revalidated with conditional GETs, and name ->
+# EIN matches are memoized so repeat runs skip the search endpoint.
+session = make_session()
+cache = HttpCache()
+name_memo = NameMemo()
 
 def get_credit_union_ein(name):
     """
@@ -36,18 +44,7 @@ def get_credit_union_ein(name):
     Parameters:
     name (str): The name of the credit union.
     """
-
-    url = "https://projects.propublica.org/nonprofits/api/v2/search.json"
-    params = {"q": name}
-    # Make a GET request to the API and parse the JSON response
-    response = requests.get(url, params=params)
-    data = response.json()
-    
-    if data.get("organizations"):
-       org = data["organizations"][0]
-       return org.get("ein"), org['name']
-    else:
-        return None, None
+    return lookup_eins([name], memo=name_memo, session=session, cache=cache)[name]
 
 
 def get_credit_union_data(ein):
@@ -61,40 +58,27 @@ def get_credit_union_data(ein):
     Returns:
     pd.DataFrame: Data fetched from the API as a pandas DataFrame.
     """
-    url = f"https://projects.propublica.org/nonprofits/api/v2/organizations/{ein}.json"
-    response = requests.get(url)
-    
+    url = organization_url(ein)
+    response = cache.get(session, url) if cache is not None else session.get(url)
+
     if response.status_code != 200:
         raise Exception(f"Error fetching data: {response.status_code} - {response.text}")
-    data = response.json()
-    filings = data.get("filings_with_data", [])
-    if not filings: 
-        return pd.DataFrame()  # Return empty DataFrame if no filings found
-    df = pd.json_normalize(filings)
-
-    #Add organization data
-    org_data = data.get("organization", {})
-    for key, value in org_data.items():
-        df[key] = value
-    # print("Organization Data:", org_data)
-    print("Org name:", org_data.get("name", "").lower())
-    if any(substr in org_data.get("name", "").lower() for substr in ["chartered in", "credit unions in"]):
-        if "sort_name" in org_data:
-            fixed_name = re.sub(r'^\d+\s+', '', org_data["sort_name"]).strip()
-            print("Fixed name:", fixed_name)
-            df["name"] = fixed_name
-
-    #Filter relevant columns
-    df = df[["name", "ein", "tax_prd_yr", "totassetsend", "totliabend", "totrevenue", "totfuncexpns", "invstmntinc"]]
-    df.rename(columns={
-        "tax_prd_yr": "Year",
-        "totassetsend": "Total Assets",
-        "totliabend": "Total Liabilities",
-        "totrevenue": "Total Revenue",
-        "totfuncexpns": "Total Expenses",
-        "invstmntinc": "Investment Income"
-    }, inplace=True)
-    return df
+    return credit_union_frame(response.json())
+
+
+def credit_union_frame(data):
+    """
+    Build the financials DataFrame from one organization's API JSON.
+
+    Parameters:
+    data (dict): Parsed JSON of the organization endpoint.
+
+    Returns:
+    pd.DataFrame: One row per filing, empty if there are no filings.
+    """
+    table = FilingTable()
+    table.add(data)
+    return table.to_frame()
 
 # def get_ceo_compensation(ein):
 #     """
@@ -134,17 +118,40 @@ def get_credit_union_data(ein):
 #     df = pd.DataFrame(records)
 #     return df
 
-for cu in cu_list:
-    ein, name = get_credit_union_ein(cu)
-    if ein:
-        print(f"Found credit union: {name} with EIN: {ein}")
-        df = get_credit_union_data(ein)
-        if not df.empty:
-            all_cu_data.append(df)
+def fetch_credit_union_data(names, max_workers=4, requests_per_second=2.0):
+    """
+    Look up and fetch the financials of many credit unions concurrently.
+
+    Parameters:
+    names (list): Credit union names, e.g. cu_list.
+    max_workers (int): Maximum concurrent requests.
+    requests_per_second (float): Average rate at which requests are started.
+
+    Returns:
+    pd.DataFrame: Filings of every credit union with data, in the order of names.
+    """
+    # Rows are collected column-wise and turned into one frame for the batch
+    table = FilingTable()
+    lookups = lookup_eins(names, memo=name_memo, max_workers=max_workers,
+                          requests_per_second=requests_per_second, session=session, cache=cache)
+    found = {}
+    for cu, (ein, name) in lookups.items():
+        if ein:
+            print(f"Found credit union: {name} with EIN: {ein}")
+            found[ein] = cu
         else:
-            print(f"No data available for {cu}.")
-    else:
-        print(f"Credit union {cu} not found.")
+            print(f"Credit union {cu} not found.")
+
+    organizations = fetch_organizations(list(found), max_workers=max_workers,
+                                        requests_per_second=requests_per_second, session=session, cache=cache)
+    for ein, data, error in organizations:
+        if error:
+            print(f"Error fetching data for {found[ein]}: {error}")
+            continue
+        if not table.add(data):
+            print(f"No data available for {found[ein]}.")
+    return table.to_frame()
+
 # 
 # for cu in cu_list:
 #     ein, name = get_credit_union_ein(cu)
@@ -158,16 +165,23 @@ for cu in cu_list:
 #     else:
 #         print(f"Credit union {cu} not found.") 
 
-if all_cu_data:
-    combined_df = pd.concat(all_cu_data, ignore_index=True)
-    combined_df['Net Income'] = combined_df['Total Revenue'] - combined_df['Total Expenses']
-    # Download the data to Excel file
-    with pd.ExcelWriter('credit_union_data.xlsx', engine='openpyxl') as writer:
-        combined_df.to_excel(writer, sheet_name='Financials', index=False)
-else:
-    print("No data found for any credit unions.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch credit union financials from the ProPublica API")
+    parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent requests")
+    parser.add_argument('--rate', type=float, default=2.0, help="Average requests started per second")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    cache = cache_from_args(args)
 
-print(combined_df)
+    combined_df = fetch_credit_union_data(cu_list, max_workers=args.workers, requests_per_second=args.rate)
+    if not combined_df.empty:
+        combined_df['Net Income'] = combined_df['Total Revenue'] - combined_df['Total Expenses']
+        # Download the data to Excel file
+        with pd.ExcelWriter('credit_union_data.xlsx', engine='openpyxl') as writer:
+            combined_df.to_excel(writer, sheet_name='Financials', index=False)
+        print(combined_df)
+    else:
+        print("No data found for any credit unions.")
 
 """ credit_union_name = input("Enter the name of the credit union: ")
 ein, name = get_credit_union_ein(credit_union_name)
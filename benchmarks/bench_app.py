@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Headless rerun-latency benchmark for credit_union_app.py.
+#
+#   python benchmarks/bench_app.py                      # 21, 500 and 5,000 credit unions
+#   python benchmarks/bench_app.py --sizes 21 --reruns 50
+#
+# Each workbook size runs in its own subprocess so peak RSS is per size.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "credit_union_app.py")
+sys.path.insert(0, REPO_DIR)
+
+FINANCIAL_VARIABLES = [
+    'Total Revenue', 'Total Expenses', 'Net Income', 'Total Assets',
+    'Total Liabilities', 'Investment Income', 'Cash On Hand',
+    'Total Loans & Leases', 'Commercial and Industrial Loans'
+]
+
+
+def generate_workbook(path, n_credit_unions, seed=0):
+    """Write a synthetic workbook with CEO_Comp and Combined_Financials_2 sheets shaped like the real one"""
+    rng = np.random.default_rng(seed)
+    names = [f"Credit Union {i:05d}" for i in range(n_credit_unions)]
+    eins = [f"{100000000 + i * 7919:09d}" for i in range(n_credit_unions)]
+
+    ceo_years = np.arange(2013, 2024)
+    n = len(ceo_years)
+    compensation = rng.lognormal(13, 0.5, n_credit_unions * n).round()
+    other_comp = rng.lognormal(11, 1, n_credit_unions * n).round()
+    ceo = pd.DataFrame({
+        'name': np.repeat(names, n),
+        'ein': np.repeat(eins, n),
+        'year': np.tile(ceo_years, n_credit_unions),
+        'ceo_name': [f"CEO {i // 4}" for i in range(n_credit_unions * n)],
+        'compensation': compensation,
+        'other_comp': other_comp,
+        'total_comp': compensation + other_comp,
+        'ceo_change': rng.random(n_credit_unions * n) < 0.08,
+        'm_or_a': rng.random(n_credit_unions * n) < 0.1,
+    })
+
+    fin_years = np.arange(2011, 2025)
+    n = len(fin_years)
+    scale = np.repeat(rng.lognormal(21, 1, n_credit_unions), n)
+    financial = pd.DataFrame({
+        'ein': np.repeat(eins, n),
+        'name': np.repeat(names, n),
+        'Year': np.tile(fin_years, n_credit_unions),
+    })
+    for i, variable in enumerate(FINANCIAL_VARIABLES):
+        values = scale * rng.lognormal(-3 + 0.3 * i, 0.3, len(financial))
+        values[rng.random(len(financial)) < 0.15] = np.nan
+        financial[variable] = values.round()
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        ceo.to_excel(writer, sheet_name='CEO_Comp', index=False)
+        financial.to_excel(writer, sheet_name='Combined_Financials_2', index=False)
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of a list of timings"""
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+def scripted_interactions(at, n_reruns, seed=0):
+    """Yield (label, action) pairs that change one widget each, like an analyst clicking around"""
+    rng = random.Random(seed)
+    credit_unions = list(at.selectbox[0].options)
+    overview_options = list(at.selectbox[-1].options)
+    for i in range(n_reruns):
+        kind = rng.choice(['credit_union', 'variable', 'variable', 'benchmark', 'overview'])
+        if kind == 'credit_union':
+            value = rng.choice(credit_unions)
+            yield kind, lambda value=value: at.selectbox[0].select(value)
+        elif kind == 'variable':
+            graph = rng.randrange(1, 5)
+            value = rng.choice(FINANCIAL_VARIABLES)
+            yield kind, lambda graph=graph, value=value: at.selectbox[graph].select(value)
+        elif kind == 'benchmark':
+            value = rng.choice(at.radio[0].options)
+            yield kind, lambda value=value: at.radio[0].set_value(value)
+        else:
+            value = rng.choice(overview_options)
+            yield kind, lambda value=value: at.selectbox[-1].select(value)
+
+
+def run_size(workbook, n_reruns, timeout):
+    """Benchmark one workbook in this process and return the results as a dict"""
+    import logging
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    import dashboard_startup
+    from sidecar_cache import sidecar_path
+
+    logging.disable(logging.WARNING)
+    os.environ["CU_DASHBOARD_DATA"] = workbook
+
+    def cold_run():
+        # Drop the per-process caches so the next run loads the workbook again
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        dashboard_startup.LOAD_TIMINGS.clear()
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return at, elapsed, dict(dashboard_startup.LOAD_TIMINGS)
+
+    # First load parses the workbook with openpyxl and writes the sidecars,
+    # the second reads the sidecars like a restarted server process would
+    for stale in [sidecar_path(workbook, 'CEO_Comp'), sidecar_path(workbook, 'Combined_Financials_2'),
+                  dashboard_startup.name_index_path(workbook)]:
+        if os.path.exists(stale):
+            os.remove(stale)
+    _, first_run_sidecar_miss, load_miss = cold_run()
+    at, first_run, load_hit = cold_run()
+
+    reruns = {}
+    for kind, action in scripted_interactions(at, n_reruns):
+        action()
+        start = time.perf_counter()
+        at.run()
+        reruns.setdefault(kind, []).append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    all_reruns = [t for times in reruns.values() for t in times]
+
+    return {
+        'workbook': workbook,
+        'first_run_sidecar_miss_s': first_run_sidecar_miss,
+        'first_run_s': first_run,
+        'load_data_sidecar_miss_s': load_miss.get('load_data'),
+        'load_financial_data_sidecar_miss_s': load_miss.get('load_financial_data'),
+        'load_data_s': load_hit.get('load_data'),
+        'load_financial_data_s': load_hit.get('load_financial_data'),
+        'reruns': len(all_reruns),
+        'rerun_p50_s': percentile(all_reruns, 50),
+        'rerun_p95_s': percentile(all_reruns, 95),
+        'rerun_p50_by_widget_s': {kind: statistics.median(times) for kind, times in reruns.items()},
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def print_report(results):
+    """Print one line per workbook size"""
+    print(f"{'CUs':>6} {'load_data':>10} {'load_fin':>10} {'1st run':>9} {'p50 rerun':>10} {'p95 rerun':>10} {'peak RSS':>9}")
+    for size, r in results.items():
+        print(f"{size:>6} {r['load_data_s']:>9.3f}s {r['load_financial_data_s']:>9.3f}s {r['first_run_s']:>8.3f}s "
+              f"{r['rerun_p50_s'] * 1000:>8.1f}ms {r['rerun_p95_s'] * 1000:>8.1f}ms {r['peak_rss_mb']:>7.0f}MB")
+        print(f"{'':>6} sidecar miss: load_data {r['load_data_sidecar_miss_s']:.3f}s, "
+              f"load_financial_data {r['load_financial_data_sidecar_miss_s']:.3f}s, "
+              f"first run {r['first_run_sidecar_miss_s']:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless rerun-latency benchmark for the dashboard")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[21, 500, 5000],
+                        help="Number of credit unions per generated workbook")
+    parser.add_argument('--reruns', type=int, default=30, help="Scripted widget changes per size")
+    parser.add_argument('--workdir', help="Where generated workbooks are kept (default: a temp dir)")
+    parser.add_argument('--timeout', type=float, default=600, help="AppTest timeout per run, in seconds")
+    parser.add_argument('--json', help="Also write the results to this file")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # Subprocess mode: benchmark one workbook, print JSON for the parent
+        print(json.dumps(run_size(args.worker, args.reruns, args.timeout)))
+        return
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='cu_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    for size in args.sizes:
+        workbook = os.path.join(workdir, f"credit_unions_{size}.xlsx")
+        if not os.path.exists(workbook):
+            print(f"Generating workbook with {size} credit unions...")
+            generate_workbook(workbook, size)
+        print(f"Benchmarking {size} credit unions...")
+        out = subprocess.run(
+            [sys.executable, __file__, '--worker', workbook, '--reruns', str(args.reruns),
+             '--timeout', str(args.timeout)],
+            check=True, capture_output=True, text=True)
+        # The app prints its startup line to stdout too; the result is the last line
+        results[size] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+# Timing of the data_cleaning.py steps on synthetic CEO_Comp sheets.
+#
+#   python benchmarks/bench_cleaning.py                   # 5,000 and 50,000 CEO-year rows
+#   python benchmarks/bench_cleaning.py --sizes 200000
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from data_cleaning import add_merger_acquisition, ceo_comparison, standardize_ceo_names  # noqa: E402
+
+FIRST_NAMES = ['Richard', 'Rick', 'John', 'Jon', 'Mary', 'Ann', 'Robert', 'Bob', 'Susan', 'Tim']
+LAST_NAMES = ['Brandsma', 'Smith', 'Doe', 'Lee', 'Park', 'Nguyen', 'Roe', 'Kim', 'Garcia', 'Olson']
+
+
+def synthetic_ceo_sheet(n_rows, seed=0):
+    """CEO_Comp-shaped frame: about 11 years per credit union, a few CEOs each,
+    spelled inconsistently now and then"""
+    rng = random.Random(seed)
+    rows = []
+    n_cus = max(1, n_rows // 11)
+    for cu in range(n_cus):
+        ceo = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        for year in range(2013, 2024):
+            if len(rows) == n_rows:
+                break
+            if rng.random() < 0.15:
+                ceo = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            spelled = ceo.upper() if rng.random() < 0.05 else ceo
+            compensation = float(rng.randint(10**5, 10**6))
+            rows.append((f"Credit Union {cu}", f"{100000000 + cu:09d}", year, spelled, compensation, 0.0, compensation))
+    return pd.DataFrame(rows, columns=['name', 'ein', 'year', 'ceo_name', 'compensation', 'other', 'total'])
+
+
+def synthetic_merger_events(ceo_sheet, n_events, seed=0):
+    """M&A events table for random (EIN, year) pairs of a CEO sheet, some sharing a year"""
+    rng = random.Random(seed)
+    pairs = list(zip(ceo_sheet['ein'], ceo_sheet['year']))
+    rows = [(*rng.choice(pairs), f"Acquired Credit Union {i}", float(rng.randint(10**6, 10**9)))
+            for i in range(n_events)]
+    return pd.DataFrame(rows, columns=['ein', 'year', 'acquired_institution', 'acquired_assets'])
+
+
+def timed(run, repeat):
+    """Best of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data_cleaning.py steps")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000], help="CEO-year rows per sheet")
+    parser.add_argument('--events', type=int, default=5000, help="M&A events in the events table")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per step (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'step':<24} {'rows':>8} {'seconds':>8}")
+    for size in args.sizes:
+        df = synthetic_ceo_sheet(size)
+        events = synthetic_merger_events(df, args.events)
+        steps = [
+            ('standardize_ceo_names', lambda: standardize_ceo_names(df.copy())),
+            ('ceo_comparison', lambda: ceo_comparison(df)),
+            ('add_merger_acquisition', lambda: add_merger_acquisition(df, events)),
+        ]
+        for label, run in steps:
+            print(f"{label:<24} {len(df):>8} {timed(run, args.repeat):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
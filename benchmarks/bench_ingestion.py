@@ -0,0 +1,141 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+# Offline throughput benchmark for the whole ingestion path, in EINs per second.
+#
+#   python benchmarks/bench_ingestion.py                          # 200 synthetic EINs
+#   python benchmarks/bench_ingestion.py --store fixtures --latency 0.15 --jitter 0.1
+#   python benchmarks/bench_ingestion.py --error-rate 0.05
+#
+# Requests go to fixture_server.py (recorded or synthetic responses), never to
+# ProPublica. Record a real store first with `python fixture_server.py --record`.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from fixture_server import FixtureStore, start_server  # noqa: E402
+
+
+def synthetic_page(rng, name, years):
+    """Organization page with the markup the scrapers read, plus filler"""
+    sections = []
+    for year in years:
+        rows = ''.join(
+            f'<tr class="employee-row shortlist"><td>Person {i} ({rng.choice(["CEO", "President", "Treasurer"])})</td>'
+            f'<td>${rng.randint(10**5, 10**6):,}</td><td>$0</td><td>${rng.randint(0, 10**5):,}</td></tr>'
+            for i in range(rng.randint(1, 3)))
+        sections.append(
+            f'<section id="filing{year}" class="single-filing-period">'
+            f'<div class="extract-summary"><div class="row-revenue__number">${rng.randint(10**6, 10**9):,}</div>'
+            f'<div class="row-summary__item"><div class="row-summary__hed">Expenses</div>'
+            f'<div class="row-summary__number">${rng.randint(10**6, 10**9):,}</div></div></div>'
+            f'<table class="assets-debt"><tbody><tr><td>Total Assets</td><td>${rng.randint(10**7, 10**10):,}</td></tr>'
+            f'<tr><td>Total Liabilities</td><td>${rng.randint(10**7, 10**10):,}</td></tr></tbody></table>'
+            f'<table class="employees"><tbody>{rows}</tbody></table>'
+            f'<p>{"Filing details " * 150}</p></section>')
+    nav = '<nav>' + '<a href="#">Link</a>' * 400 + '</nav>'
+    return f'<html><body>{nav}<h1>{name}</h1>{"".join(sections)}</body></html>'.encode()
+
+
+def synthetic_store(path, n_eins, seed=0):
+    """Fill a fixture store with n_eins organizations: HTML pages, searches and organization JSON"""
+    rng = random.Random(seed)
+    store = FixtureStore(path)
+    for i in range(n_eins):
+        ein = f"{100000000 + i * 7919:09d}"
+        name = f"Synthetic Credit Union {i}"
+        store.put(f"/organizations/{ein}", 200, "text/html; charset=utf-8",
+                  synthetic_page(rng, name, range(2023, 2011, -1)))
+        search = {"organizations": [{"ein": int(ein), "name": name.upper()}]}
+        store.put(f"/api/v2/search.json?q={quote_plus(name)}", 200, "application/json", json.dumps(search).encode())
+        filings = [{"tax_prd_yr": year, "totassetsend": rng.randint(10**7, 10**10), "totliabend": rng.randint(10**7, 10**10),
+                    "totrevenue": rng.randint(10**6, 10**9), "totfuncexpns": rng.randint(10**6, 10**9),
+                    "invstmntinc": rng.randint(0, 10**7), **{f"field_{k}": k for k in range(200)}}
+                   for year in range(2012, 2024)]
+        organization = {"organization": {"ein": int(ein), "name": name.upper(), "sort_name": name},
+                        "filings_with_data": filings}
+        store.put(f"/api/v2/organizations/{int(ein)}.json", 200, "application/json",
+                  json.dumps(organization).encode())
+    return store
+
+
+def store_keys(store):
+    """EINs with an organization page and names with a search response in a store"""
+    eins, names = [], []
+    for path in store.index:
+        parsed = urlparse(path)
+        if parsed.path.startswith("/organizations/"):
+            eins.append(parsed.path.rsplit("/", 1)[1])
+        elif parsed.path.endswith("/search.json"):
+            names.extend(parse_qs(parsed.query).get("q", []))
+    return eins, names
+
+
+def timed(run):
+    """Run with the scrapers' progress output silenced; return (result, seconds)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingestion throughput benchmark")
+    parser.add_argument('--store', help="Recorded fixture store (default: synthetic responses in a temp dir)")
+    parser.add_argument('--generate', type=int, default=200, help="Synthetic EINs when no --store is given")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.05, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=503, help="Status code of injected errors")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent requests")
+    parser.add_argument('--rate', type=float, default=1000.0, help="Requests started per second")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="Worker processes for page parsing")
+    args = parser.parse_args()
+
+    store_path = args.store
+    if store_path is None:
+        store_path = tempfile.mkdtemp(prefix='cu_fixtures_')
+        print(f"Generating {args.generate} synthetic organizations in {store_path}...")
+        synthetic_store(store_path, args.generate)
+    server = start_server(store_path, latency=args.latency, jitter=args.jitter,
+                          error_rate=args.error_rate, error_status=args.error_status)
+    eins, names = store_keys(server.store)
+
+    # The scrapers read the base URL when they are imported
+    os.environ["PROPUBLICA_BASE_URL"] = server.base_url
+    import API_requests
+    from ceo_comp_scraper import ceo_comp_scraper
+    from combined_scraper import combined_scraper
+    from overall_cu_scraper import financial_scraper
+
+    API_requests.cache = None
+    API_requests.name_memo = None
+    options = dict(max_workers=args.workers, requests_per_second=args.rate)
+    runs = [
+        ('ceo_comp_scraper', eins, lambda: ceo_comp_scraper(eins, processes=args.processes, **options)),
+        ('financial_scraper', eins, lambda: financial_scraper(eins, processes=args.processes, **options)),
+        ('combined_scraper', eins, lambda: combined_scraper(eins, processes=args.processes, **options)),
+        ('API_requests', names, lambda: API_requests.fetch_credit_union_data(names, **options)),
+    ]
+    print(f"{len(eins)} EINs, {len(names)} names; latency {args.latency}s + up to {args.jitter}s, "
+          f"error rate {args.error_rate}, {args.workers} workers, {args.processes} parse processes")
+    print(f"{'path':<18} {'EINs':>6} {'seconds':>8} {'EINs/s':>8}")
+    for label, keys, run in runs:
+        if not keys:
+            print(f"{label:<18} skipped (nothing recorded)")
+            continue
+        _, seconds = timed(run)
+        print(f"{label:<18} {len(keys):>6} {seconds:>8.2f} {len(keys) / seconds:>8.1f}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
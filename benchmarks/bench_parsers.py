@@ -0,0 +1,116 @@
+import argparse
+import contextlib
+import gzip
+import io
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+# Per-page parse time of each HTML parser backend on saved organization pages.
+#
+#   python benchmarks/bench_parsers.py                   # pages in .http_cache/
+#   python benchmarks/bench_parsers.py --pages saved/    # a directory of .html files
+#
+# Every backend's CEO and financial records are checked against a full
+# html.parser parse (what the scrapers used to do) before its time is reported.
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from combined_scraper import parse_org_page  # noqa: E402
+from propublica_pages import HTML_PARSERS, filing_sections, org_name_from_soup, parse_org_html  # noqa: E402
+
+
+def load_pages(path):
+    """Read saved pages from a directory of .html files or an http_cache directory.
+    Returns:
+        list: (name, content bytes) pairs.
+    """
+    pages = []
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if name.endswith(('.html', '.htm')):
+            with open(full, 'rb') as f:
+                pages.append((name, f.read()))
+        elif name.endswith('.gz'):
+            with gzip.open(full, 'rb') as f:
+                content = f.read()
+            # The response cache also holds API JSON; keep only HTML pages
+            if content.lstrip()[:1] == b'<':
+                pages.append((name, content))
+    return pages
+
+
+def full_parse_records(content, ein):
+    """CEO and financial records from a full html.parser tree, as the scrapers built before"""
+    from ceo_comp_scraper import ceo_records
+    from overall_cu_scraper import financial_records
+
+    soup = BeautifulSoup(content, 'html.parser')
+    org_name = org_name_from_soup(soup, ein)
+    sections = filing_sections(soup)
+    return ceo_records(sections, ein, org_name), financial_records(sections, ein, org_name)
+
+
+def time_per_page(pages, parse, repeat):
+    """Median seconds per page for parse(content), best of `repeat` passes over all pages"""
+    passes = []
+    for _ in range(repeat):
+        times = []
+        for _, content in pages:
+            start = time.perf_counter()
+            parse(content)
+            times.append(time.perf_counter() - start)
+        passes.append(statistics.median(times))
+    return min(passes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends on saved organization pages")
+    parser.add_argument('--pages', default=os.path.join(REPO_DIR, '.http_cache'),
+                        help="Directory of saved .html pages or an http_cache directory")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes over the pages per backend")
+    parser.add_argument('--ein', default='420804594', help="EIN used when extracting records (multi-year by default)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages) if os.path.isdir(args.pages) else []
+    if not pages:
+        sys.exit(f"No saved HTML pages found in {args.pages}")
+    sizes = [len(content) for _, content in pages]
+    print(f"{len(pages)} pages, median {statistics.median(sizes) / 1024:.0f} KiB")
+
+    backends = [('html.parser (full tree)', lambda content: BeautifulSoup(content, 'html.parser')),
+                ('lxml (full tree)', lambda content: BeautifulSoup(content, 'lxml'))]
+    for html_parser in HTML_PARSERS:
+        backends.append((f"{html_parser} (filtered)",
+                         lambda content, html_parser=html_parser: parse_org_html(content, html_parser)))
+
+    # The scrapers print per-year progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = [full_parse_records(content, args.ein) for _, content in pages]
+
+    print(f"{'backend':<26} {'parse/page':>11} {'parse+extract/page':>19} {'records':>8}")
+    for label, parse in backends:
+        try:
+            parse_time = time_per_page(pages, parse, args.repeat)
+        except ImportError as e:
+            print(f"{label:<26} skipped ({e.name} not installed)")
+            continue
+        if label.endswith('(full tree)'):
+            print(f"{label:<26} {parse_time * 1000:>9.2f}ms {'':>19} {'':>8}")
+            continue
+        html_parser = label.split()[0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            extract_time = time_per_page(pages, lambda content: parse_org_page(content, args.ein, html_parser),
+                                         args.repeat)
+            matches = all(tuple(parse_org_page(content, args.ein, html_parser)) == records
+                          for (_, content), records in zip(pages, expected))
+        print(f"{label:<26} {parse_time * 1000:>9.2f}ms {extract_time * 1000:>17.2f}ms "
+              f"{'same' if matches else 'DIFFER':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+import argparse
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from ceo_comp_scraper import empty_record
+
+# Streaming ingester for locally downloaded bulk datasets, covering every
+# credit union without one page request per EIN.
+#
+#   python bulk_ingest.py --irs 2023_TEOS_XML_01A.zip 2023_TEOS_XML_02A.zip
+#   python bulk_ingest.py --ncua call-report-data-2023-12.zip --ein-map cu_eins.csv
+#
+# Archives are read member by member straight out of the zip file, and each
+# Form 990 is parsed incrementally and dropped as soon as its fields are read,
+# so memory holds one filing at a time plus the output rows.
+
+# Columns of the Combined_Financials_2 sheet
+FINANCIAL_COLUMNS = [
+    "ein", "name", "Year", "Total Assets", "Total Liabilities", "Total Revenue", "Total Expenses",
+    "Net Income", "Investment Income", "Cash On Hand", "Total Loans & Leases", "Commercial and Industrial Loans",
+]
+
+# Form 990 Part I elements (2013+ e-file schema), and the column each one becomes
+IRS_990_FIELDS = {
+    "TotalAssetsEOYAmt": "Total Assets",
+    "TotalLiabilitiesEOYAmt": "Total Liabilities",
+    "CYTotalRevenueAmt": "Total Revenue",
+    "CYTotalExpensesAmt": "Total Expenses",
+    "CYRevenuesLessExpensesAmt": "Net Income",
+    "CYInvestmentIncomeAmt": "Investment Income",
+}
+
+# Exempt-status checkboxes of a Form 990; credit unions check 501(c)(14)
+EXEMPT_STATUS_TAGS = {"Organization501c3Ind", "Organization501cInd", "Organization4947a1NotPFInd",
+                      "Organization527Ind"}
+
+# 5300 call report accounts, and the column each one becomes
+NCUA_ACCOUNTS = {
+    "ACCT_010": "Total Assets",
+    "ACCT_661A": "Net Income",
+    "ACCT_730A": "Cash On Hand",
+    "ACCT_025B": "Total Loans & Leases",
+}
+
+CEO_TITLES = ['ceo', 'president', 'chief executive officer']
+
+
+def local_name(tag):
+    """Element tag without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def child_text(elem, *path):
+    """Text of the descendant at a path of local names, or None"""
+    for name in path:
+        elem = next((child for child in elem if local_name(child.tag) == name), None)
+        if elem is None:
+            return None
+    return (elem.text or '').strip() or None
+
+
+def parse_amount(text):
+    """Convert an e-file amount to float"""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_990_filing(stream, eins=None):
+    """Read the fields kept from one IRS e-file XML document.
+    Args:
+        stream (file): Binary stream of the XML document.
+        eins (set, optional): EINs to keep. When not given, every 501(c)(14)
+            (credit union) filer is kept.
+    Returns:
+        dict: ein, name, year, filed_at, financial ({column: value}) and
+            officers (Part VII section A entries), or None when the document
+            isn't a wanted Form 990. Unwanted documents are abandoned as soon
+            as that is known, without reading the rest.
+    """
+    filing = {"ein": None, "name": None, "year": None, "filed_at": "", "financial": {}, "officers": []}
+    return_type = None
+    credit_union = False
+    depth = 0
+    in_data = False
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        tag = local_name(elem.tag)
+        if event == "start":
+            depth += 1
+            if tag == "ReturnData":
+                in_data = True
+            continue
+        level, depth = depth, depth - 1
+
+        if not in_data:
+            if tag == "ReturnTs":
+                filing["filed_at"] = elem.text or ""
+            elif tag == "ReturnTypeCd":
+                return_type = elem.text
+                if return_type != "990":
+                    return None
+            elif tag == "Filer" and level == 3:
+                filing["ein"] = (child_text(elem, "EIN") or "").zfill(9)
+                filing["name"] = (child_text(elem, "BusinessName", "BusinessNameLine1Txt")
+                                  or child_text(elem, "BusinessName", "BusinessNameLine1"))
+                if eins is not None and filing["ein"] not in eins:
+                    return None
+            elif tag == "TaxYr":
+                filing["year"] = int(elem.text)
+            continue
+
+        if tag in EXEMPT_STATUS_TAGS:
+            credit_union = tag == "Organization501cInd" and elem.get("organization501cTypeTxt") == "14"
+            if eins is None and not credit_union:
+                return None
+        elif tag == "Form990PartVIISectionAGrp":
+            filing["officers"].append({
+                "name": child_text(elem, "PersonNm") or child_text(elem, "BusinessName", "BusinessNameLine1Txt"),
+                "title": child_text(elem, "TitleTxt") or "",
+                "compensation": parse_amount(child_text(elem, "ReportableCompFromOrgAmt")),
+                "other": parse_amount(child_text(elem, "OtherCompensationAmt")),
+            })
+        elif tag in IRS_990_FIELDS:
+            filing["financial"].setdefault(IRS_990_FIELDS[tag], parse_amount(elem.text))
+        # Every part of a form or schedule is done with once it ends
+        if level in (3, 4):
+            elem.clear()
+
+    if return_type != "990" or filing["year"] is None or (eins is None and not credit_union):
+        return None
+    return filing
+
+
+def ceo_from_officers(filing):
+    """CEO_Comp record of a filing, in the same shape ceo_comp_scraper.py builds.
+
+    As the scrapers do with ProPublica's employee shortlist, only the two
+    highest paid people are checked for a CEO or President title.
+    """
+    officers = sorted(filing["officers"], key=lambda o: (o["compensation"] or 0) + (o["other"] or 0),
+                      reverse=True)
+    for officer in officers[:2]:
+        if any(title in officer["title"].lower() for title in CEO_TITLES):
+            # The scrapers record $0 amounts as missing
+            compensation = officer["compensation"] or None
+            other = officer["other"] or None
+            total = (compensation or 0) + (other or 0)
+            return {
+                'name': filing["name"],
+                'ein': filing["ein"],
+                'year': filing["year"],
+                'ceo_name': officer["name"],
+                'compensation': compensation,
+                'other': other,
+                'total': total if total > 0 else None
+            }
+    return empty_record(filing["ein"], filing["name"], filing["year"])
+
+
+def irs_filings(zip_path, eins=None):
+    """Yield the wanted Form 990 filings in an IRS e-file XML archive, one at a time.
+    Args:
+        zip_path (str): Archive of <object id>_public.xml documents.
+        eins (set, optional): EINs to keep; every credit union when not given.
+    Yields:
+        dict: Filings as returned by parse_990_filing.
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            if not info.filename.lower().endswith('.xml'):
+                continue
+            with archive.open(info) as stream:
+                try:
+                    filing = parse_990_filing(stream, eins)
+                except ElementTree.ParseError as e:
+                    print(f"Skipping malformed {info.filename}: {e}")
+                    continue
+            if filing is not None:
+                yield filing
+
+
+def ncua_financials(zip_path, ein_map):
+    """Read Combined_Financials_2 columns from an NCUA 5300 call report archive.
+    Args:
+        zip_path (str): Quarterly call report zip (FOICU.txt, FS220*.txt, ...).
+        ein_map (dict): {cu_number: ein}. Call reports carry no EIN, so credit
+            unions missing from it are skipped.
+    Returns:
+        list: One financial record per credit union.
+    """
+    reports = {}
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            if not info.filename.lower().endswith('.txt'):
+                continue
+            with archive.open(info) as stream:
+                reader = csv.reader(io.TextIOWrapper(stream, encoding='latin-1', newline=''))
+                header = [column.strip().upper() for column in next(reader, [])]
+                if 'CU_NUMBER' not in header:
+                    continue
+                wanted = {header.index(column): column_name for column, column_name in NCUA_ACCOUNTS.items()
+                          if column in header}
+                if 'CU_NAME' in header:
+                    wanted[header.index('CU_NAME')] = 'name'
+                if not wanted:
+                    continue
+                number_at = header.index('CU_NUMBER')
+                cycle_at = header.index('CYCLE_DATE') if 'CYCLE_DATE' in header else None
+                for row in reader:
+                    ein = ein_map.get(row[number_at].strip())
+                    if ein is None:
+                        continue
+                    record = reports.setdefault(ein, {'ein': ein})
+                    if cycle_at is not None:
+                        # e.g. "12/31/2023 0:00:00"
+                        record['Year'] = int(row[cycle_at].split()[0].split('/')[-1])
+                    for index, column_name in wanted.items():
+                        value = row[index].strip()
+                        record[column_name] = value if column_name == 'name' else parse_amount(value)
+    return [record for record in reports.values() if 'Year' in record]
+
+
+def read_ein_map(path):
+    """Read a CSV with cu_number and ein columns into {cu_number: ein}"""
+    with open(path, newline='') as f:
+        return {row['cu_number'].strip(): row['ein'].strip().zfill(9) for row in csv.DictReader(f)}
+
+
+def bulk_ingest(irs_zips=(), ncua_zips=(), ein_map=None, eins=None):
+    """Build CEO_Comp and Combined_Financials_2 rows from bulk archives.
+    Args:
+        irs_zips (list): IRS Form 990 e-file XML archives.
+        ncua_zips (list): NCUA 5300 call report archives.
+        ein_map (dict, optional): {cu_number: ein}, required for NCUA archives.
+        eins (set, optional): EINs to keep from the IRS archives; every
+            501(c)(14) filer when not given.
+    Returns:
+        tuple: (CEO DataFrame, financial DataFrame). Where an organization
+            has several returns for a year, the latest filed one is used; where
+            both sources have a value, the Form 990 value is kept.
+    """
+    latest = {}
+    for zip_path in irs_zips:
+        count = 0
+        for filing in irs_filings(zip_path, eins):
+            count += 1
+            key = (filing["ein"], filing["year"])
+            if key not in latest or filing["filed_at"] >= latest[key]["filed_at"]:
+                latest[key] = {"filed_at": filing["filed_at"], "ceo": ceo_from_officers(filing),
+                               "financial": {"ein": filing["ein"], "name": filing["name"], "Year": filing["year"],
+                                             **filing["financial"]}}
+        print(f"{zip_path}: {count} credit union filings")
+
+    ceo_df = pd.DataFrame([entry["ceo"] for entry in latest.values()],
+                          columns=['name', 'ein', 'year', 'ceo_name', 'compensation', 'other', 'total'])
+    financial_rows = [entry["financial"] for entry in latest.values()]
+    for zip_path in ncua_zips:
+        records = ncua_financials(zip_path, ein_map or {})
+        print(f"{zip_path}: {len(records)} call reports matched to an EIN")
+        financial_rows.extend(records)
+
+    financial_df = pd.DataFrame(financial_rows, columns=FINANCIAL_COLUMNS)
+    financial_df = financial_df.groupby(['ein', 'Year'], as_index=False, sort=True).first()[FINANCIAL_COLUMNS]
+    return ceo_df.sort_values(['ein', 'year'], kind='stable').reset_index(drop=True), financial_df
+
+
+def add_sheet(dataframe, sheet_name, filename='credit_union_data.xlsx'):
+    """Add ingested records as a sheet of the credit union data file"""
+    try:
+        with pd.ExcelWriter(filename, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
+            dataframe.to_excel(writer, sheet_name=sheet_name, index=False)
+        print(f"Successfully added {len(dataframe)} records to sheet '{sheet_name}' of {filename}")
+    except FileNotFoundError:
+        dataframe.to_excel(filename, sheet_name=sheet_name, index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest credit union filings from bulk IRS 990 and NCUA 5300 downloads")
+    parser.add_argument('--irs', nargs='+', default=[], help="IRS Form 990 e-file XML zip archives")
+    parser.add_argument('--ncua', nargs='+', default=[], help="NCUA 5300 call report zip archives")
+    parser.add_argument('--ein-map', help="CSV with cu_number and ein columns, matching call reports to EINs")
+    parser.add_argument('--eins', help="File with one EIN per line to keep (default: every 501(c)(14) filer)")
+    parser.add_argument('--output', default='credit_union_data.xlsx', help="Workbook the sheets are written to")
+    parser.add_argument('--ceo-sheet', default='CEO_Comp_bulk', help="Sheet for CEO_Comp-shaped records")
+    parser.add_argument('--financial-sheet', default='Combined_Financials_bulk',
+                        help="Sheet for Combined_Financials_2-shaped records")
+    args = parser.parse_args()
+    if not args.irs and not args.ncua:
+        parser.error("give at least one --irs or --ncua archive")
+    if args.ncua and not args.ein_map:
+        parser.error("--ncua needs --ein-map, since call reports carry no EIN")
+
+    eins = None
+    if args.eins:
+        with open(args.eins) as f:
+            eins = {line.strip().zfill(9) for line in f if line.strip()}
+    ceo_df, financial_df = bulk_ingest(args.irs, args.ncua, read_ein_map(args.ein_map) if args.ein_map else None, eins)
+    print("\nResults:")
+    print(ceo_df)
+    print(financial_df)
+    if not ceo_df.empty:
+        add_sheet(ceo_df, args.ceo_sheet, filename=args.output)
+    add_sheet(financial_df, args.financial_sheet, filename=args.output)
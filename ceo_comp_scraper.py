@@ -1,112 +1,116 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import pandas as pd
-import time
 import re
+from http_cache import add_cache_arguments, cache_from_args
+from propublica_pages import DEFAULT_HTML_PARSER, filing_sections, org_name_from_soup, parse_org_html
+from scrape_state import (CheckpointLog, add_scraper_arguments, checkpoint_path, merge_with_stored,
+                          read_stored_sheet, scrape_eins, stored_filing_years)
 
-def ceo_comp_scraper(ein_list):
+# Filing years with a CEO record per EIN
+CEO_YEARS = range(2013, 2024)
+# Columns of each CEO record
+CEO_COLUMNS = ['ein', 'name', 'year', 'ceo_name', 'compensation', 'other', 'total']
+
+def ceo_comp_scraper(ein_list, max_workers=4, requests_per_second=2.0, cache=None,
+                     html_parser=DEFAULT_HTML_PARSER, stored_years=None, checkpoint=None,
+                     processes=1):
     """Scrapes CEO compensation data from ProPublica Nonprofits site for given EINs.
     Args:
         ein_list (list): List of EINs to scrape data for.
+        max_workers (int): Maximum number of pages fetched at once.
+        requests_per_second (float): Average rate at which requests are started.
+        cache (http_cache.HttpCache, optional): On-disk response cache.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        stored_years (dict, optional): {ein: years} already captured by an earlier
+            run. Those years are skipped, and EINs with every year captured aren't fetched.
+        checkpoint (scrape_state.CheckpointLog, optional): Log each finished EIN's
+            records are appended to. EINs already in it are not scraped again.
+        processes (int): Worker processes parsing pages while later ones download.
     Returns:
         pd.DataFrame: DataFrame containing CEO compensation data for each EIN and year.
     """
+    stored_years = stored_years or {}
+    ein_list = [ein for ein in ein_list if not set(CEO_YEARS) <= stored_years.get(ein, set())]
+    records_by_ein = scrape_eins(
+        ein_list, parse_ceo_page, lambda ein: (ein, html_parser, stored_years.get(ein, ())),
+        lambda ein: [empty_record(ein, f"Unknown ({ein})", year)
+                     for year in CEO_YEARS if year not in stored_years.get(ein, ())],
+        ('ceo',), checkpoint=checkpoint, processes=processes,
+        max_workers=max_workers, requests_per_second=requests_per_second, cache=cache)
+    return pd.DataFrame([record for ein in ein_list for record in records_by_ein[ein]])
+
+def parse_ceo_page(content, ein, html_parser=DEFAULT_HTML_PARSER, skip_years=()):
+    """Extract one CEO record per year (2013-2023) from an organization page.
+    Args:
+        content (bytes): HTML of the ProPublica organization page.
+        ein (str): EIN of the organization.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        skip_years (set, optional): Years already captured; no records are made for them.
+    Returns:
+        list: CEO compensation records, with empty records for years without data.
+    """
+    soup = parse_org_html(content, html_parser)
+    org_name = org_name_from_soup(soup, ein)
+    print(f"Found organization: {org_name}")
+    return ceo_records(filing_sections(soup), ein, org_name, skip_years)
+
+def ceo_records(sections, ein, org_name, skip_years=()):
+    """Extract one CEO record per year (2013-2023) from a page's filing sections.
+    Args:
+        sections (list): (year, section) pairs from propublica_pages.filing_sections.
+        ein (str): EIN of the organization.
+        org_name (str): Organization name.
+        skip_years (set, optional): Years already captured; no records are made for them.
+    Returns:
+        list: CEO compensation records, with empty records for years without data.
+    """
     results = []
-    
-    for ein in ein_list:
-        print(f"Processing EIN: {ein}")
-        url = f"https://projects.propublica.org/nonprofits/organizations/{ein}"
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Get org name
-            h1_element = soup.find('h1')
-            if h1_element:
-                h1_text = h1_element.text.strip().lower()
-    
-            # Check if h1 contains generic terms
-                if any(term in h1_text for term in ['chartered in', 'credit unions in']):
-            # Extract from the specific div class
-                    org_div = soup.find('div', class_='text-hed-900 org-sort-name')
-                    if org_div:
-                        org_name = org_div.text.strip()
-                        fixed_name = re.sub(r'^\d+\s+', '', org_name).strip()
-                        org_name = fixed_name
+    print(f"Found {len(sections)} filing sections")
+
+    for year, section in sections:
+        if year in CEO_YEARS and year not in skip_years:
+            # Find the employees table in this section
+            employees_table = section.find('table', class_='employees')
+
+            if employees_table:
+                # Find ALL employee-row shortlist rows
+                ceo_rows = employees_table.find_all('tr', class_='employee-row shortlist')
+
+                if ceo_rows:
+                    ceo_data = None
+
+                    # Check first row
+                    if len(ceo_rows) >= 1:
+                        ceo_data = extract_ceo_from_row(ceo_rows[0], ein, org_name, year)
+                        if ceo_data:
+                            print(f"{year}: Found CEO in row 1 - {ceo_data['ceo_name']} - ${ceo_data['total']:,}")
+
+                    # If no CEO found in first row, check second row
+                    if not ceo_data and len(ceo_rows) >= 2:
+                        ceo_data = extract_ceo_from_row(ceo_rows[1], ein, org_name, year)
+                        if ceo_data:
+                            print(f"{year}: Found CEO in row 2 - {ceo_data['ceo_name']} - ${ceo_data['total']:,}")
+
+                    # Add the result (either CEO data or an empty record)
+                    if ceo_data:
+                        results.append(ceo_data)
                     else:
-                        org_name = f"Unknown ({ein})"
+                        results.append(empty_record(ein, org_name, year))
+                        print(f"{year}: No CEO found in first 2 rows")
                 else:
-                #   Use h1 as normal
-                    org_name = h1_element.text.strip()
-            else:
-                org_name = f"Unknown ({ein})"
-            print(f"Found organization: {org_name}")
-            
-            # Find all filing sections available (like filing2022, filing2023, etc.)
-            filing_sections = soup.find_all('section', class_='single-filing-period')
-            print(f"Found {len(filing_sections)} filing sections")
-            
-            for section in filing_sections:
-                # Extract year from the section id (like "filing2022")
-                section_id = section.get('id', '')
-                year_match = re.search(r'filing(\d{4})', section_id)
-                
-                if year_match:
-                    year = int(year_match.group(1))
-                    
-                    if 2013 <= year <= 2023:
-                        # Find the employees table in this section
-                        employees_table = section.find('table', class_='employees')
-                        
-                        if employees_table:
-                            # Find ALL employee-row shortlist rows
-                            ceo_rows = employees_table.find_all('tr', class_='employee-row shortlist')
-                            
-                            if ceo_rows:
-                                ceo_data = None
-                                
-                                # Check first row
-                                if len(ceo_rows) >= 1:
-                                    ceo_data = extract_ceo_from_row(ceo_rows[0], ein, org_name, year)
-                                    if ceo_data:
-                                        print(f"{year}: Found CEO in row 1 - {ceo_data['ceo_name']} - ${ceo_data['total']:,}")
-                                
-                                # If no CEO found in first row, check second row
-                                if not ceo_data and len(ceo_rows) >= 2:
-                                    ceo_data = extract_ceo_from_row(ceo_rows[1], ein, org_name, year)
-                                    if ceo_data:
-                                        print(f"{year}: Found CEO in row 2 - {ceo_data['ceo_name']} - ${ceo_data['total']:,}")
-                                
-                                # Add the result (either CEO data or an empty record)
-                                if ceo_data:
-                                    results.append(ceo_data)
-                                else:
-                                    results.append(empty_record(ein, org_name, year))
-                                    print(f"{year}: No CEO found in first 2 rows")
-                            else:
-                                results.append(empty_record(ein, org_name, year))
-                                print(f"{year}: No employee-row shortlist found")
-                        else:
-                            results.append(empty_record(ein, org_name, year))
-                            print(f"{year}: No employees table found")
-            
-            # Add empty records for missing years
-            found_years = {r['year'] for r in results if r['ein'] == ein}
-            for year in range(2013, 2024):
-                if year not in found_years:
                     results.append(empty_record(ein, org_name, year))
-                    print(f"{year}: No filing section found")
-                    
-        except Exception as e:
-            print(f"Error processing EIN {ein}: {e}")
-            for year in range(2013, 2024):
-                results.append(empty_record(ein, f"Unknown ({ein})", year))
-                
-        time.sleep(1)
-        
-    return pd.DataFrame(results)
+                    print(f"{year}: No employee-row shortlist found")
+            else:
+                results.append(empty_record(ein, org_name, year))
+                print(f"{year}: No employees table found")
+
+    # Add empty records for missing years
+    found_years = {r['year'] for r in results}
+    for year in CEO_YEARS:
+        if year not in found_years and year not in skip_years:
+            results.append(empty_record(ein, org_name, year))
+            print(f"{year}: No filing section found")
+    return results
 
 def extract_ceo_from_row(row, ein, org_name, year):
     """Extract CEO data from the first employee-row shortlist"""
@@ -191,9 +195,6 @@ ein_list = [
     "910557925",
     "590690965"
 ]
-df = ceo_comp_scraper(ein_list)
-print("\nResults:")
-print(df)
 
 def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
     """Add CEO compensation data as a new sheet to credit union data file"""
@@ -211,4 +212,19 @@ def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
         backup_filename = 'ceo_compensation_backup.xlsx'
         dataframe.to_excel(backup_filename, sheet_name='CEO_Comp', index=False)
 
-add_ceo_sheet(df)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape CEO compensation from ProPublica Nonprofits")
+    add_scraper_arguments(parser, "Only extract filing years not already in the CEO_Comp sheet")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    cache = cache_from_args(args)
+
+    stored = read_stored_sheet('credit_union_data.xlsx', 'CEO_Comp', CEO_COLUMNS) if args.incremental else None
+    with CheckpointLog(checkpoint_path('ceo_comp_scraper'), resume=args.resume) as checkpoint:
+        df = ceo_comp_scraper(ein_list, max_workers=args.workers, requests_per_second=args.rate,
+                              cache=cache, html_parser=args.parser,
+                              stored_years=stored_filing_years(stored, 'year', 'compensation'),
+                              checkpoint=checkpoint, processes=args.processes)
+    print("\nResults:")
+    print(df)
+    add_ceo_sheet(merge_with_stored(df, stored, 'year'))
@@ -0,0 +1,97 @@
+import argparse
+import pandas as pd
+from ceo_comp_scraper import CEO_COLUMNS, CEO_YEARS, add_ceo_sheet, ceo_records, empty_record
+from http_cache import add_cache_arguments, cache_from_args
+from overall_cu_scraper import add_ceo_sheet as add_financial_sheet
+from overall_cu_scraper import FINANCIAL_COLUMNS, empty_financial_record, financial_records, years_to_scrape
+from propublica_pages import DEFAULT_HTML_PARSER, filing_sections, org_name_from_soup, parse_org_html
+from scrape_state import (CheckpointLog, add_scraper_arguments, checkpoint_path, merge_with_stored,
+                          read_stored_sheet, scrape_eins, stored_filing_years)
+
+# One fetch and one parse per organization page, producing both the CEO_Comp
+# records of ceo_comp_scraper.py and the financial records of overall_cu_scraper.py
+
+
+def parse_org_page(content, ein, html_parser=DEFAULT_HTML_PARSER, ceo_skip_years=(), financial_skip_years=()):
+    """Extract CEO and financial records from one organization page.
+    Args:
+        content (bytes): HTML of the ProPublica organization page.
+        ein (str): EIN of the organization.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        ceo_skip_years, financial_skip_years (set, optional): Years already
+            captured in each sheet; no records are made for them.
+    Returns:
+        tuple: (CEO records, financial records), the same records
+            parse_ceo_page and parse_financial_page return.
+    """
+    soup = parse_org_html(content, html_parser)
+    org_name = org_name_from_soup(soup, ein)
+    print(f"Found organization: {org_name}")
+    sections = filing_sections(soup)
+    return (ceo_records(sections, ein, org_name, ceo_skip_years),
+            financial_records(sections, ein, org_name, financial_skip_years))
+
+
+def combined_scraper(ein_list, max_workers=4, requests_per_second=2.0, cache=None,
+                     html_parser=DEFAULT_HTML_PARSER, ceo_stored_years=None, financial_stored_years=None,
+                     checkpoint=None, processes=1):
+    """Scrapes CEO compensation and financial data for given EINs in one pass.
+    Args:
+        ein_list (list): List of EINs to scrape data for.
+        max_workers (int): Maximum number of pages fetched at once.
+        requests_per_second (float): Average rate at which requests are started.
+        cache (http_cache.HttpCache, optional): On-disk response cache.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        ceo_stored_years, financial_stored_years (dict, optional): {ein: years}
+            already captured in each sheet by an earlier run. Those years are
+            skipped, and EINs complete in both sheets aren't fetched.
+        checkpoint (scrape_state.CheckpointLog, optional): Log each finished EIN's
+            records are appended to. EINs already in it are not scraped again.
+        processes (int): Worker processes parsing pages while later ones download.
+    Returns:
+        tuple: (CEO compensation DataFrame, financial DataFrame)
+    """
+    ceo_stored_years = ceo_stored_years or {}
+    financial_stored_years = financial_stored_years or {}
+    ein_list = [ein for ein in ein_list
+                if not set(CEO_YEARS) <= ceo_stored_years.get(ein, set())
+                or years_to_scrape(ein, financial_stored_years.get(ein, ()))]
+    records_by_ein = scrape_eins(
+        ein_list, parse_org_page,
+        lambda ein: (ein, html_parser, ceo_stored_years.get(ein, ()), financial_stored_years.get(ein, ())),
+        lambda ein: ([empty_record(ein, f"Unknown ({ein})", year)
+                      for year in CEO_YEARS if year not in ceo_stored_years.get(ein, ())],
+                     [empty_financial_record(ein, f"Unknown ({ein})", year)
+                      for year in years_to_scrape(ein, financial_stored_years.get(ein, ()))]),
+        ('ceo', 'financial'), checkpoint=checkpoint, processes=processes,
+        max_workers=max_workers, requests_per_second=requests_per_second, cache=cache)
+    return (pd.DataFrame([record for ein in ein_list for record in records_by_ein[ein][0]]),
+            pd.DataFrame([record for ein in ein_list for record in records_by_ein[ein][1]]))
+
+
+if __name__ == "__main__":
+    from ceo_comp_scraper import ein_list
+
+    parser = argparse.ArgumentParser(description="Scrape CEO compensation and financial data from ProPublica Nonprofits")
+    add_scraper_arguments(parser, "Only extract filing years not already in the CEO_Comp / Financial_remaining sheets")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    cache = cache_from_args(args)
+
+    ceo_stored, financial_stored = None, None
+    if args.incremental:
+        ceo_stored = read_stored_sheet('credit_union_data.xlsx', 'CEO_Comp', CEO_COLUMNS)
+        financial_stored = read_stored_sheet('credit_union_data.xlsx', 'Financial_remaining', FINANCIAL_COLUMNS)
+    with CheckpointLog(checkpoint_path('combined_scraper'), resume=args.resume) as checkpoint:
+        ceo_df, financial_df = combined_scraper(
+            ein_list, max_workers=args.workers, requests_per_second=args.rate, cache=cache, html_parser=args.parser,
+            ceo_stored_years=stored_filing_years(ceo_stored, 'year', 'compensation'),
+            financial_stored_years=stored_filing_years(financial_stored, 'Year', 'Total Revenue'),
+            checkpoint=checkpoint, processes=args.processes)
+    print("\nResults:")
+    print(ceo_df)
+    if not financial_df.empty:
+        financial_df = financial_df[financial_df['Total Revenue'].notnull()]
+    print(financial_df)
+    add_ceo_sheet(merge_with_stored(ceo_df, ceo_stored, 'year'))
+    add_financial_sheet(merge_with_stored(financial_df, financial_stored, 'Year'))
@@ -1,6 +1,14 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
+from dashboard_startup import (LOAD_TIMINGS, read_name_index, record_startup, report_startup, workbook_key,
+                               write_name_index)
+
+# pandas, plotly and the dashboard data/figure modules are imported further down
+# (and on a background thread), after the page shell and the credit union
+# dropdown have been sent to the browser
 
 # Configure Streamlit page
 st.set_page_config(
@@ -11,11 +19,33 @@ st.set_page_config(
 
 st.title("Credit Union Dashboard")
 
-# Load data from Excel file
-@st.cache_data
-def load_data():
-    df = pd.read_excel(
-        "credit_union_data.xlsx",
+# Overridable so benchmarks can point the app at generated workbooks
+DATA_FILE = os.environ.get("CU_DASHBOARD_DATA", "credit_union_data.xlsx")
+
+# Define available financial variables
+financial_variables = [
+    'Total Revenue', 'Total Expenses', 'Net Income', 'Total Assets', 
+    'Total Liabilities', 'Investment Income', 'Cash On Hand', 
+    'Total Loans & Leases', 'Commercial and Industrial Loans'
+]
+
+def load_sheets(path):
+    """Import pandas/plotly and load both sheets; runs on a background thread.
+
+    The CEO frame comes back with its EIN -> row-slice index and the
+    prebuilt CEO change / M&A marker lines, the financial frame with its EIN
+    index and the materialized peer percentile bands. Both frames are frozen
+    read-only so every session can share them.
+    """
+    from dashboard_data import (assign_peer_groups, build_event_table, build_percentile_bands, dropdown_labels,
+                                index_ceo_data, index_financial_data, share_frame)
+    from dashboard_figures import build_event_shapes
+    from sidecar_cache import read_excel_sheet
+
+    key = workbook_key(path)
+    start = time.perf_counter()
+    df = read_excel_sheet(
+        path,
         sheet_name="CEO_Comp",
         dtype={
             "name": str,
@@ -25,290 +55,15 @@ def load_data():
             "ceo_name": str,
             "compensation": float
         })
-    return df.sort_values(by=['name', 'year'])
-
-df = load_data()
-# region
-# Create figure
-# fig = go.Figure()
-
-# # Add a trace for each credit union
-# for credit_union in df['name'].unique():
-#     subset = df[df['name'] == credit_union]
-#     fig.add_trace(
-#         go.Scatter(
-#             x=subset['year'],
-#             y=subset['total_comp'],
-#             name=credit_union,
-#             visible=False,  # Start with all traces hidden
-#             hovertemplate= '<b>CEO Name:</b> %{customdata[2]}<br>' +
-#                             '<b>Total Compensation:</b> $%{y:,.0f}<br>' +
-#                             '<b>Compensation:</b> $%{customdata[0]:,.0f}<br>' + 
-#                             '<b>Other Compensation:</b> $%{customdata[1]:,.0f}<br>' +    
-#                         '<extra></extra>',                         
-#             customdata=subset[['compensation', 'other_comp', 'ceo_name']].values,
-#         )
-#     )
-
-# # Make first trace visible
-# fig.data[0].visible = True
-
-# # Create dropdown menu with shapes for CEO changes
-# buttons = []
-# for i, name in enumerate(df['name'].unique()):
-#     subset = df[df['name'] == name]
-#     ceo_change_years = subset[subset['ceo_change'] == True]['year'].tolist()
-#     ma_years = subset[subset['m_or_a'] == True]['year'].tolist()
-#
-#     # Create shapes for vertical lines: green for CEO changes, brown for mergers/acquisitions
-#     shapes = []
-#     all_years = sorted(set(ceo_change_years + ma_years))  # Get unique years
-
-#     for year in all_years:
-#         if year in ceo_change_years and year in ma_years:
-#             # Add offset lines for overlaps
-#             shapes.append(dict(
-#                 type="line", x0=year-0.03, x1=year-0.03,
-#                 y0=0, y1=1, yref="paper",
-#                 line=dict(color="green", width=3, dash="dash")
-#             ))
-#             shapes.append(dict(
-#                 type="line", x0=year+0.03, x1=year+0.03,
-#                 y0=0, y1=1, yref="paper", 
-#                 line=dict(color="brown", width=3, dash="dash")
-#             ))
-#         else:
-#             # Add normal lines for non-overlaps
-#             if year in ceo_change_years:
-#                 shapes.append(dict(
-#                     type="line", x0=year, x1=year,
-#                     y0=0, y1=1, yref="paper",
-#                     line=dict(color="green", width=3, dash="dash")
-#                 ))
-#             if year in ma_years:
-#                 shapes.append(dict(
-#                     type="line", x0=year, x1=year,
-#                     y0=0, y1=1, yref="paper",
-#                     line=dict(color="brown", width=3, dash="dash")
-#                 ))
-    
-#     # Set trace visibility
-#     visibility = [False] * len(fig.data)
-#     visibility[i] = True
-    
-#     buttons.append(
-#         dict(
-#             label=name,
-#             method='update',
-#             args=[
-#                 {'visible': visibility},
-#                 {
-#                     'title': f"Executive Compensation: {name}",
-#                     'shapes': shapes
-#                 }
-#             ]
-#         )
-#     )
-
-# # Create initial shapes for the first credit union
-# first_cu = df['name'].unique()[0]
-# first_subset = df[df['name'] == first_cu]
-# initial_shapes = []
-
-# # Add CEO change lines for first credit union
-# for year in first_subset[first_subset['ceo_change'] == True]['year'].tolist():
-#     initial_shapes.append(
-#         dict(
-#             type="line",
-#             x0=year, x1=year,
-#             y0=0, y1=1,
-#             yref="paper",
-#             line=dict(color="green", width=3, dash="dash")
-#         )
-#     )
-
-# # Add M&A lines for first credit union
-# for year in first_subset[first_subset['m_or_a'] == True]['year'].tolist():
-#     initial_shapes.append(
-#         dict(
-#             type="line",
-#             x0=year, x1=year,
-#             y0=0, y1=1,
-#             yref="paper",
-#             line=dict(color="brown", width=3, dash="dash")
-#         )
-#     )
-
-# # Update layout with dropdown
-# fig.update_layout(
-#     updatemenus=[{
-#         'buttons': buttons,
-#         'direction': 'down',
-#         'showactive': True,
-#         'x': 0.25,
-#         'y': 1.2,
-#         'pad': {'r': 10, 't': 10}
-#     }],
-#     title='Executive Compensation Over Time',
-#     xaxis_title='Year',
-#     yaxis_title='Total Compensation (USD)',
-#     height=600,
-#     shapes=initial_shapes  
-# )
-
-# # Add annotations to explain the vertical lines
-# fig.add_annotation(
-#     text="Green dashed lines = CEO Changes",
-#     x=0.02, y=0.98,
-#     xref="paper", yref="paper",
-#     showarrow=False,
-#     font=dict(color="green", size=12),
-#     bgcolor="rgba(255,255,255,0.8)"
-# )
-# fig.add_annotation(
-#     text="Brown dashed lines = Merger/Acquisition",
-#     x=0.02, y=0.93,
-#     xref="paper", yref="paper",
-#     showarrow=False,
-#     font=dict(color="brown", size=12),
-#     bgcolor="rgba(255,255,255,0.8)"
-# )
-
-# fig.update_xaxes(
-#     tickmode='linear',  
-#     dtick=1,        
-#     tick0=df['year'].min(),  
-#     tickformat='d')
-
-# # Display the main plot with dropdown
-# st.plotly_chart(fig, use_container_width=True)
-#endregion
-
-# Streamlit dropdown
-st.subheader("Executive Compensation Section")
-selected_cu = st.selectbox('Select Credit Union', df['name'].unique())
-
-# Filter data for selected credit union
-selected_subset = df[df['name'] == selected_cu]
-shapes_selected = []
-ceo_change_years = selected_subset[selected_subset['ceo_change'] == True]['year'].tolist()
-ma_years = selected_subset[selected_subset['m_or_a'] == True]['year'].tolist()
-
-all_years = sorted(set(ceo_change_years + ma_years))
-
-# Add vertical lines for the CEO name change years and Merger and Acquisition years
-
-def add_financial_vertical_lines(fig, selected_cu_name):
-    ceo_subset = selected_subset[selected_subset['name'] == selected_cu_name] if not selected_subset.empty else pd.DataFrame()
-    if not ceo_subset.empty:
-        ceo_change_years = ceo_subset[ceo_subset['ceo_change'] == True]['year'].tolist()
-        ma_years = ceo_subset[ceo_subset['m_or_a'] == True]['year'].tolist()
-        all_years = sorted(set(ceo_change_years + ma_years))
-        
-        for year in all_years:
-            if year in ceo_change_years and year in ma_years:
-                # CEO change line (slightly left)
-                fig.add_vline(x=year-0.1, line_color="green", line_width=3, line_dash="dash")
-                # M&A line (slightly right)  
-                fig.add_vline(x=year+0.1, line_color="brown", line_width=3, line_dash="dash")
-            else:
-                if year in ceo_change_years:
-                    fig.add_vline(x=year, line_color="green", line_width=3, line_dash="dash")
-                if year in ma_years:
-                    fig.add_vline(x=year, line_color="brown", line_width=3, line_dash="dash")
-    fig.add_annotation(
-    text="Green dashed lines = CEO Changes",
-    x=0.02, y=0.98,
-    xref="paper", yref="paper",
-    showarrow=False,
-    font=dict(color="green", size=12),
-    bgcolor="rgba(255,255,255,0.8)"
-    )
-    fig.add_annotation(
-    text="Brown dashed lines = Merger/Acquisition",
-    x=0.02, y=0.93,
-    xref="paper", yref="paper",
-    showarrow=False,
-    font=dict(color="brown", size=12),
-    bgcolor="rgba(255,255,255,0.8)"
-    )
-        
-    return fig
-
-# Create a separate figure for the selected credit union
-fig_selected = go.Figure()
-
-fig_selected.add_trace(
-    go.Scatter(
-        x=selected_subset['year'],
-        y=selected_subset['total_comp'],
-        name=selected_cu,
-        hovertemplate= '<b>CEO Name:</b> %{customdata[2]}<br>' +
-                        '<b>Total Compensation:</b> $%{y:,.0f}<br>' +
-                        '<b>Compensation:</b> $%{customdata[0]:,.0f}<br>' + 
-                        '<b>Other Compensation:</b> $%{customdata[1]:,.0f}<br>' +    
-                    '<extra></extra>',                         
-        customdata=selected_subset[['compensation', 'other_comp', 'ceo_name']].values,
-    )
-)
-
-
-# for year in all_years:
-#     if year in ceo_change_years and year in ma_years:
-#         # Modify the shapes to offset overlapping years
-#         # CEO change line (slightly left)
-#         shapes_selected.append(dict(
-#             type="line", x0=year-0.1, x1=year-0.1,
-#             y0=0, y1=1, yref="paper",
-#             line=dict(color="green", width=3, dash="dash")
-#         ))
-#         # M&A line (slightly right)  
-#         shapes_selected.append(dict(
-#             type="line", x0=year+0.1, x1=year+0.1,
-#             y0=0, y1=1, yref="paper",
-#             line=dict(color="brown", width=3, dash="dash")
-#         ))
-#     else:
-#         if year in ceo_change_years:
-#             shapes_selected.append(dict(
-#                 type="line", x0=year, x1=year,
-#                 y0=0, y1=1, yref="paper",
-#                 line=dict(color="green", width=3, dash="dash")
-#             ))
-#         if year in ma_years:
-#             shapes_selected.append(dict(
-#                 type="line", x0=year, x1=year,
-#                 y0=0, y1=1, yref="paper",
-#                 line=dict(color="brown", width=3, dash="dash")
-#             ))
-add_financial_vertical_lines(fig_selected, selected_cu)
-fig_selected.update_layout(
-    title=f"Total Executive Compensation: {selected_cu}",
-    xaxis_title='Year',
-    yaxis_title='Total Compensation (USD)',
-    height=600,
-    shapes=shapes_selected,
-    hoverlabel=dict(
-            bgcolor='white',
-            font=dict(color='black', size=12),
-            bordercolor='black'
-    )
-)
-
-fig_selected.update_xaxes(
-    tickmode='linear',  
-    dtick=1,        
-    tick0=selected_subset['year'].min(),  
-    tickformat='d')
-
-# Display the selected credit union plot
-st.plotly_chart(fig_selected, use_container_width=True)
-
-#load financial data
-@st.cache_data
-def load_financial_data():
-    return pd.read_excel(
-        "credit_union_data.xlsx",
+    df, index = share_frame(*index_ceo_data(df))
+    ceo_data = (df, index, build_event_shapes(build_event_table(df)))
+    # Next cold start can render the dropdown from this without touching pandas
+    write_name_index(path, dropdown_labels(df, index), key)
+    LOAD_TIMINGS['load_data'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = read_excel_sheet(
+        path,
         sheet_name="Combined_Financials_2",
         dtype={
             "name": str,
@@ -324,154 +79,196 @@ def load_financial_data():
             "Total Loans & Leases": float,
             "Commercial and Industrial Loans": float
         })
+    df, index = share_frame(*index_financial_data(df))
+    peer_groups = assign_peer_groups(df)
+    financial_data = (df, index, peer_groups, build_percentile_bands(df, financial_variables, peer_groups))
+    LOAD_TIMINGS['load_financial_data'] = time.perf_counter() - start
+    record_startup('data_ready')
+    return ceo_data, financial_data
+
+# Started once per server process; every session shares the result
+@st.cache_resource
+def background_load():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='cu-data').submit(load_sheets, DATA_FILE)
+
+def loaded_sheets():
+    """Wait for the background load. A failed load is dropped from the cache
+    before re-raising, so the next rerun starts a fresh one instead of
+    re-raising the same stored error forever."""
+    try:
+        return background_load().result()
+    except Exception:
+        background_load.clear()
+        raise
+
+# The shared frames are only ever handed out as per-call views, so no caller
+# can write to, add or replace a column of the copy every session reads
+def load_data():
+    """CEO compensation frame, its row index and event marker shapes"""
+    from dashboard_data import session_view
+    df, index, shapes = loaded_sheets()[0]
+    return session_view(df), index, shapes
 
-df_financial = load_financial_data()
+def load_financial_data():
+    """Financial frame, its EIN index, asset-size peer groups and percentile bands"""
+    from dashboard_data import session_view
+    df, index, peer_groups, bands = loaded_sheets()[1]
+    return session_view(df), index, peer_groups, bands
+
+# Figures are memoized as serialized JSON, keyed by credit union, variable and
+# overlay settings, so a rerun only rebuilds the charts whose inputs changed
+FIGURE_CACHE_ENTRIES = 256
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def chart_json(selected_ein, variable=None, line_color=None, show_events=True, peer_group=None):
+    """Build one chart for a credit union and return it as plotly JSON.
+    variable=None builds the executive compensation chart, otherwise the
+    chart for that financial variable, optionally over `peer_group`'s
+    percentile band."""
+    ceo_df, ceo_index, cu_event_shapes = load_data()
+    selected_subset = ceo_df.iloc[ceo_index['ein'][selected_ein]]
+    selected_cu = str(selected_subset['name'].iloc[0])
+    event_shapes = cu_event_shapes.get(selected_ein, ()) if show_events else None
+
+    if variable is None:
+        fig = build_figure(
+            x=selected_subset['year'],
+            y=selected_subset['total_comp'],
+            name=selected_cu,
+            title=f"Total Executive Compensation: {selected_cu}",
+            yaxis_title='Total Compensation (USD)',
+            height=600,
+            hovertemplate=CEO_HOVERTEMPLATE,
+            customdata=selected_subset[['compensation', 'other_comp', 'ceo_name']].values,
+            line_color=line_color,
+            event_shapes=event_shapes,
+            tick0=selected_subset['year'].min())
+    else:
+        financial_df, fin_index, _, bands = load_financial_data()
+        financial_subset = financial_df.iloc[fin_index['ein'].get(selected_ein, slice(0, 0))]
+        data_subset = financial_subset.dropna(subset=[variable])
+        fig = build_figure(
+            x=data_subset['Year'],
+            y=data_subset[variable],
+            name=variable,
+            title=f"{variable}: {selected_cu}",
+            yaxis_title=f'{variable} (USD)',
+            height=400,
+            hovertemplate=financial_hovertemplate(variable),
+            line_color=line_color,
+            event_shapes=event_shapes,
+            band=bands.get((variable, peer_group)),
+            band_label=peer_group)
+    return fig.to_json()
+
+# The overview draws every credit union at once: one WebGL trace per asset-size
+# peer group with NaN gaps between institutions, downsampled on the server so
+# the browser gets a bounded payload however many credit unions are loaded
+OVERVIEW_POINT_BUDGET = 20000
+TOTAL_COMP = 'Total Executive Compensation'
+
+@st.cache_data(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def overview_json(variable, selected_ein, point_budget=OVERVIEW_POINT_BUDGET):
+    """Build the all-institutions overview for one variable and return it as plotly JSON"""
+    ceo_df, ceo_index, _ = load_data()
+    financial_df, _, peer_groups, _ = load_financial_data()
+    selected_cu = str(ceo_df['name'].iloc[ceo_index['ein'][selected_ein].start])
+    if variable == TOTAL_COMP:
+        frame = ceo_df[['ein', 'name', 'year', 'total_comp']].rename(columns={'year': 'Year', 'total_comp': variable})
+    else:
+        frame = financial_df[['ein', 'name', 'Year', variable]]
+
+    sampled = downsample_series(frame, 'ein', 'Year', variable, point_budget, keep=[selected_ein])
+    peer_group = sampled['ein'].map(peer_groups)
+    groups = []
+    for label in [label for _, label in ASSET_PEER_GROUPS]:
+        rows = sampled[peer_group == label]
+        groups.append((label, rows['ein'], rows['Year'], rows[variable], rows['name']))
+    rows = sampled[peer_group.isna()]
+    if not rows.empty:
+        groups.append(('No asset data', rows['ein'], rows['Year'], rows[variable], rows['name']))
+
+    selected_rows = frame[(frame['ein'] == selected_ein) & frame[variable].notna()].sort_values('Year')
+    fig = build_overview_figure(
+        groups,
+        title=f"{variable}: all credit unions ({frame['ein'].nunique():,} institutions)",
+        yaxis_title=f'{variable} (USD)',
+        highlight=(selected_cu, selected_rows['Year'], selected_rows[variable]))
+    return fig.to_json()
+
+# Each section below is a fragment: changing a widget inside one reruns only
+# that fragment. The selected credit union is their shared input, so only
+# the credit union dropdown reruns the whole page.
+@st.fragment
+def executive_compensation_section(selected_ein):
+    # Display the selected credit union plot
+    st.plotly_chart(pio.from_json(chart_json(selected_ein)), use_container_width=True)
+
+# Start importing and loading in the background before rendering anything
+background_load()
+
+# Streamlit dropdown, from the prebuilt label index when it is up to date. Each
+# label maps to one EIN, since credit unions can share a name
+st.subheader("Executive Compensation Section")
+cu_labels = read_name_index(DATA_FILE)
+if cu_labels is None:
+    from dashboard_data import dropdown_labels
+    df, cu_index, _ = load_data()
+    cu_labels = dropdown_labels(df, cu_index)
+selected_ein = cu_labels[st.selectbox('Select Credit Union', list(cu_labels))]
+record_startup('first_interactive')
 
-st.subheader("Financial Performance Section")
+# Heavy imports: already loaded (or loading) on the background thread by now
+import plotly.io as pio
+from dashboard_data import ALL_PEERS, ASSET_PEER_GROUPS, downsample_series
+from dashboard_figures import CEO_HOVERTEMPLATE, build_figure, build_overview_figure, financial_hovertemplate
 
-# Use the same selected credit union from the dropdown above
-selected_cu_financial = selected_cu  
+executive_compensation_section(selected_ein)
 
-# Filter financial data for selected credit union
-selected_financial_subset = df_financial[df_financial['name'] == selected_cu_financial]
+st.subheader("Financial Performance Section")
 
-# Define available financial variables
-financial_variables = [
-    'Total Revenue', 'Total Expenses', 'Net Income', 'Total Assets', 
-    'Total Liabilities', 'Investment Income', 'Cash On Hand', 
-    'Total Loans & Leases', 'Commercial and Industrial Loans'
-]
+# Optional benchmark band: all credit unions or the selected one's asset-size peers
+_, _, peer_groups, _ = load_financial_data()
+benchmark = st.radio('Peer benchmark', ['None', ALL_PEERS, 'Asset-size peers'], horizontal=True)
+if benchmark == 'Asset-size peers':
+    peer_group = peer_groups.get(selected_ein)
+    if peer_group is None:
+        # Peer groups come from the most recent Total Assets, which this credit union lacks
+        st.caption("No asset-size peer group is available for this credit union (no Total Assets on record)")
+    else:
+        st.caption(f"Asset-size peer group: {peer_group}")
+elif benchmark == ALL_PEERS:
+    peer_group = ALL_PEERS
+else:
+    peer_group = None
+
+@st.fragment
+def financial_graph(selected_ein, graph_number, default_index, line_color, peer_group=None):
+    """Selectable financial variable chart for the selected credit union"""
+    selected_var = st.selectbox(f'Select Financial Variable (Graph {graph_number}):', financial_variables, index=default_index)
+    st.subheader(f"{selected_var}")
+    fig = pio.from_json(chart_json(selected_ein, selected_var, line_color, peer_group=peer_group))
+    st.plotly_chart(fig, use_container_width=True)
 
 # Create 2 by 2 layout using columns
 col1, col2 = st.columns(2)
 
 with col1:
-    # Graph 1: Selectable Financial Variable
-    selected_var1 = st.selectbox('Select Financial Variable (Graph 1):', financial_variables, index=0)
-    data_subset1 = selected_financial_subset.dropna(subset=[selected_var1]).sort_values('Year')
-    
-    st.subheader(f"{selected_var1}")
-    fig1 = go.Figure()
-    fig1.add_trace(
-        go.Scatter(
-            x=data_subset1['Year'],
-            y=data_subset1[selected_var1],
-            name=selected_var1,
-            line=dict(color='blue'),
-            hovertemplate='<b>Year:</b> %{x}<br>' +
-                         f'<b>{selected_var1}:</b> $%{{y:,.0f}}<br>' +
-                         '<extra></extra>'
-        )
-    )
-    fig1 = add_financial_vertical_lines(fig1, selected_cu_financial)
-    fig1.update_layout(
-        title=f"{selected_var1}: {selected_cu_financial}",
-        xaxis_title='Year',
-        yaxis_title=f'{selected_var1} (USD)',
-        height=400,
-        hoverlabel=dict(
-            bgcolor='white',
-            font=dict(color='black', size=12),
-            bordercolor='black'
-        )
-    )
-    fig1.update_xaxes(tickmode='linear', dtick=1, tickformat='d')
-    st.plotly_chart(fig1, use_container_width=True)
-    
-    # Graph 3: Selectable Financial Variable
-    selected_var3 = st.selectbox('Select Financial Variable (Graph 3):', financial_variables, index=2)
-    data_subset3 = selected_financial_subset.dropna(subset=[selected_var3]).sort_values('Year')
-    
-    st.subheader(f"{selected_var3}")
-    fig3 = go.Figure()
-    fig3.add_trace(
-        go.Scatter(
-            x=data_subset3['Year'],
-            y=data_subset3[selected_var3],
-            name=selected_var3,
-            line=dict(color='green'),
-            hovertemplate='<b>Year:</b> %{x}<br>' +
-                         f'<b>{selected_var3}:</b> $%{{y:,.0f}}<br>' +
-                         '<extra></extra>'
-        )
-    )
-    fig3 = add_financial_vertical_lines(fig3, selected_cu_financial)
-    fig3.update_layout(
-        title=f"{selected_var3}: {selected_cu_financial}",
-        xaxis_title='Year',
-        yaxis_title=f'{selected_var3} (USD)',
-        height=400,
-       hoverlabel=dict(
-            bgcolor='white',
-            font=dict(color='black', size=12),
-            bordercolor='black'
-    )
-    )
-    fig3.update_xaxes(tickmode='linear', dtick=1, tickformat='d')
-    st.plotly_chart(fig3, use_container_width=True)
+    financial_graph(selected_ein, 1, 0, 'blue', peer_group)
+    financial_graph(selected_ein, 3, 2, 'green', peer_group)
 
 with col2:
-    # Graph 2: Selectable Financial Variable
-    selected_var2 = st.selectbox('Select Financial Variable (Graph 2):', financial_variables, index=3)
-    data_subset2 = selected_financial_subset.dropna(subset=[selected_var2]).sort_values('Year')
-    
-    st.subheader(f"{selected_var2}")
-    fig2 = go.Figure()
-    fig2.add_trace(
-        go.Scatter(
-            x=data_subset2['Year'],
-            y=data_subset2[selected_var2],
-            name=selected_var2,
-            line=dict(color='red'),
-            hovertemplate='<b>Year:</b> %{x}<br>' +
-                         f'<b>{selected_var2}:</b> $%{{y:,.0f}}<br>' +
-                         '<extra></extra>'
-        )
-    )
-    fig2 = add_financial_vertical_lines(fig2, selected_cu_financial)
-    fig2.update_layout(
-        title=f"{selected_var2}: {selected_cu_financial}",
-        xaxis_title='Year',
-        yaxis_title=f'{selected_var2} (USD)',
-        height=400,
-        hoverlabel=dict(
-            bgcolor='white',
-            font=dict(color='black', size=12),
-            bordercolor='black'
-        )
-    )
-    fig2.update_xaxes(tickmode='linear', dtick=1, tickformat='d')
-    st.plotly_chart(fig2, use_container_width=True)
-    
-    # Graph 4: Selectable Financial Variable
-    selected_var4 = st.selectbox('Select Financial Variable (Graph 4):', financial_variables, index=5)
-    data_subset4 = selected_financial_subset.dropna(subset=[selected_var4]).sort_values('Year')
-    
-    st.subheader(f"{selected_var4}")
-    fig4 = go.Figure()
-    fig4.add_trace(
-        go.Scatter(
-            x=data_subset4['Year'],
-            y=data_subset4[selected_var4],
-            name=selected_var4,
-            line=dict(color='purple'),
-            hovertemplate='<b>Year:</b> %{x}<br>' +
-                         f'<b>{selected_var4}:</b> $%{{y:,.0f}}<br>' +
-                         '<extra></extra>'
-        )
-    )
-    fig4 = add_financial_vertical_lines(fig4, selected_cu_financial)
-    fig4.update_layout(
-        title=f"{selected_var4}: {selected_cu_financial}",
-        xaxis_title='Year',
-        yaxis_title=f'{selected_var4} (USD)',
-        height=400,
-        hoverlabel=dict(
-            bgcolor='white',
-            font=dict(color='black', size=12),
-            bordercolor='black'
-        )
-    )
-    fig4.update_xaxes(tickmode='linear', dtick=1, tickformat='d')
-    st.plotly_chart(fig4, use_container_width=True)
+    financial_graph(selected_ein, 2, 3, 'red', peer_group)
+    financial_graph(selected_ein, 4, 5, 'purple', peer_group)
+
+@st.fragment
+def overview_section(selected_ein):
+    """Every credit union at once for one variable, with the selected one highlighted"""
+    overview_var = st.selectbox('Select Overview Variable:', [TOTAL_COMP] + financial_variables)
+    st.plotly_chart(pio.from_json(overview_json(overview_var, selected_ein)), use_container_width=True)
+
+st.subheader("All Institutions Overview")
+overview_section(selected_ein)
 
+# Time to first interactive vs. time until all data was loaded, once per process
+report_startup()
@@ -0,0 +1,237 @@
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+
+def build_row_index(df, key):
+    """Map each value of `key` to the slice of rows it occupies.
+
+    The frame must already be sorted so that each value's rows form one
+    contiguous block; the block boundaries are found from the categorical
+    codes in a single pass, so looking a value up afterwards is an O(1) slice
+    instead of a boolean scan over the whole frame.
+
+    Args:
+        df (pd.DataFrame): Frame sorted by `key`.
+        key (str): Column to index.
+    Returns:
+        dict: {value: slice} usable with df.iloc.
+    """
+    codes = pd.Categorical(df[key]).codes
+    if len(codes) == 0:
+        return {}
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    values = df[key].to_numpy()[starts]
+    if len(set(values)) != len(values):
+        raise ValueError(f"Rows for each '{key}' must be contiguous; sort the frame by '{key}' first")
+    return {value: slice(int(start), int(end)) for value, start, end in zip(values, starts, ends)}
+
+
+def index_ceo_data(df):
+    """Sort CEO compensation data into contiguous per-EIN blocks and index them.
+
+    Rows are keyed by EIN because different credit unions can share a name.
+
+    Returns:
+        tuple: (sorted DataFrame, {'ein': {ein: slice}})
+    """
+    df = df.sort_values(by=['ein', 'year'], kind='stable').reset_index(drop=True)
+    df['name'] = df['name'].astype('category')
+    return df, {'ein': build_row_index(df, 'ein')}
+
+
+def dropdown_labels(df, index):
+    """{label: ein} for the credit union dropdown, ordered by name.
+
+    The label is the credit union's name, with its EIN added when another
+    credit union has the same name, so every label picks exactly one EIN.
+    """
+    names = {ein: str(df['name'].iloc[rows.start]) for ein, rows in index['ein'].items()}
+    counts = {}
+    for name in names.values():
+        counts[name] = counts.get(name, 0) + 1
+    ordered = sorted(names.items(), key=lambda item: (item[1], item[0]))
+    return {(f"{name} ({ein})" if counts[name] > 1 else name): ein for ein, name in ordered}
+
+
+def index_financial_data(df):
+    """Sort financial data into contiguous per-EIN blocks and index them.
+
+    Financial rows are keyed by EIN rather than name because the sheet mixes
+    spellings of the same credit union (e.g. 'Dfcu Financial' and
+    'DFCU Financial' for the 2024 rows).
+
+    Returns:
+        tuple: (sorted DataFrame, {'ein': {ein: slice}})
+    """
+    df = df.sort_values(by=['ein', 'Year'], kind='stable').reset_index(drop=True)
+    return df, {'ein': build_row_index(df, 'ein')}
+
+
+def _read_only(values):
+    """Return a read-only, zero-copy view of a column's backing array"""
+    if isinstance(values, pd.Categorical):
+        return pd.Categorical.from_codes(_read_only(values.codes), dtype=values.dtype)
+    if isinstance(values, np.ndarray):
+        values = values.view()
+        values.flags.writeable = False
+    return values
+
+
+def freeze_frame(df):
+    """Rebuild a frame on read-only views of its own column buffers.
+
+    In-place writes (df.loc[...] = ..., df.iloc[...] = ...) on numeric and
+    categorical columns raise "assignment destination is read-only" instead of
+    silently changing data shared with every other session. String columns
+    and column add/replace are not covered here, so the frozen frame should
+    only be handed out through session_view.
+    """
+    columns = {col: _read_only(df[col].values) for col in df.columns}
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def share_frame(df, index):
+    """Freeze a loaded frame and its row index for sharing across sessions via st.cache_resource"""
+    frozen_index = MappingProxyType({key: MappingProxyType(slices) for key, slices in index.items()})
+    return freeze_frame(df), frozen_index
+
+
+def session_view(df):
+    """Per-call view of a shared frame.
+
+    A shallow copy costs O(columns), not O(rows). Adding or replacing columns
+    only changes the view, and with pandas copy-on-write an in-place edit,
+    including one on a string column, copies just the touched column; the
+    shared frame is left as it was.
+    """
+    return df.copy(deep=False)
+
+
+def build_event_table(df):
+    """Precompute where each credit union's CEO change and M&A markers go.
+
+    Years with both a CEO change and an M&A get the CEO line 0.1 to the left
+    and the M&A line 0.1 to the right so both stay visible.
+
+    Returns:
+        pd.DataFrame: One row per marker with columns ein, year, x and
+        event ('ceo_change' or 'm_or_a'), in plotting order.
+    """
+    events = df.loc[df['ceo_change'] | df['m_or_a'], ['ein', 'year', 'ceo_change', 'm_or_a']]
+    events = events.drop_duplicates(subset=['ein', 'year'])
+    offset = np.where(events['ceo_change'] & events['m_or_a'], 0.1, 0.0)
+
+    ceo = events.loc[events['ceo_change'], ['ein', 'year']]
+    ceo['x'] = (events['year'] - offset)[events['ceo_change']]
+    ceo['event'] = 'ceo_change'
+    ma = events.loc[events['m_or_a'], ['ein', 'year']]
+    ma['x'] = (events['year'] + offset)[events['m_or_a']]
+    ma['event'] = 'm_or_a'
+
+    table = pd.concat([ceo, ma], ignore_index=True)
+    return table.sort_values(['ein', 'year', 'x'], kind='stable').reset_index(drop=True)
+
+
+# Percentile bands drawn behind each financial chart
+BAND_PERCENTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+ALL_PEERS = 'All credit unions'
+# Asset-size peer groups, assigned from each credit union's latest Total Assets
+ASSET_PEER_GROUPS = (
+    (1e9, 'Under $1B'),
+    (5e9, '$1B - $5B'),
+    (10e9, '$5B - $10B'),
+    (np.inf, '$10B and over'),
+)
+
+
+def assign_peer_groups(df):
+    """Map each EIN to its asset-size peer group, based on its most recent Total Assets"""
+    latest = df.dropna(subset=['Total Assets']).sort_values('Year', kind='stable')
+    latest = latest.groupby('ein', sort=False)['Total Assets'].last()
+    bounds = np.array([bound for bound, _ in ASSET_PEER_GROUPS])
+    labels = np.array([label for _, label in ASSET_PEER_GROUPS])
+    groups = labels[np.searchsorted(bounds, latest.to_numpy(), side='right')]
+    return dict(zip(latest.index, groups.tolist()))
+
+
+def build_percentile_bands(df, variables, peer_groups):
+    """Materialize per-(variable, peer group, year) percentiles of the financial data.
+
+    Quantiles are computed once for all credit unions and once per asset-size
+    peer group, so drawing a benchmark band is a dictionary lookup.
+
+    Args:
+        df (pd.DataFrame): Financial data with ein and Year columns.
+        variables (list): Financial columns to summarize.
+        peer_groups (dict): {ein: peer group} from assign_peer_groups.
+    Returns:
+        dict: {(variable, peer group): DataFrame with Year and p10..p90 columns}
+    """
+    variables = list(variables)
+    percentiles = list(BAND_PERCENTILES)
+    columns = [f'p{round(q * 100)}' for q in BAND_PERCENTILES]
+    everyone = df[['Year'] + variables].assign(peer_group=ALL_PEERS)
+    # Credit unions with no Total Assets on record only count towards ALL_PEERS
+    peers = df[['Year'] + variables].assign(peer_group=df['ein'].map(peer_groups)).dropna(subset=['peer_group'])
+
+    quantiles = pd.concat([
+        everyone.groupby(['peer_group', 'Year'])[variables].quantile(percentiles),
+        peers.groupby(['peer_group', 'Year'])[variables].quantile(percentiles),
+    ])
+    quantiles.index = quantiles.index.set_names('percentile', level=-1)
+
+    bands = {}
+    for variable in variables:
+        wide = quantiles[variable].unstack('percentile').dropna(how='all')
+        wide.columns = columns
+        for peer_group, band in wide.groupby(level='peer_group', sort=False):
+            bands[(variable, peer_group)] = band.droplevel('peer_group').reset_index()
+    return MappingProxyType(bands)
+
+
+def downsample_series(df, key, x, y, budget, keep=()):
+    """Reduce a long frame of many per-credit-union series to a point budget.
+
+    Every series costs its points plus one NaN separator once merged into a
+    trace. If the whole frame fits, it is returned as is. Otherwise series are
+    first thinned to an even spread across the ranking of their latest value
+    (so the spread of the universe survives) until each can keep up to ten
+    points, always keeping the series in `keep`. Any series longer than its
+    share of the budget is then decimated to evenly spaced points, including
+    its first and last.
+
+    Args:
+        df (pd.DataFrame): Long frame with one row per (key, x).
+        key (str): Column identifying each series.
+        x, y (str): Columns to plot.
+        budget (int): Maximum number of points (separators included).
+        keep (iterable, optional): Series that must not be dropped.
+    Returns:
+        pd.DataFrame: Rows of df to draw, sorted by key and x.
+    """
+    df = df[df[y].notna()].sort_values([key, x], kind='stable')
+    sizes = df.groupby(key, sort=False, observed=True).size()
+    if len(df) + len(sizes) <= budget:
+        return df
+
+    # Drop series until each kept one can show most of a typical series
+    min_points = int(max(2, min(sizes.median(), 10)))
+    max_series = max(1, budget // (min_points + 1))
+    if len(sizes) > max_series:
+        latest = df.groupby(key, sort=False, observed=True)[y].last().sort_values(kind='stable')
+        ranked = latest.index.to_numpy()
+        chosen = set(ranked[np.unique(np.linspace(0, len(ranked) - 1, max_series).round().astype(int))])
+        chosen.update(k for k in keep if k in latest.index)
+        df = df[df[key].isin(chosen)]
+        sizes = sizes[sizes.index.isin(chosen)]
+
+    # Evenly spaced points within each series, capped at its share of the budget
+    cap = max(2, budget // len(sizes) - 1)
+    n = df.groupby(key, sort=False, observed=True)[x].transform('size').to_numpy()
+    pos = df.groupby(key, sort=False, observed=True).cumcount().to_numpy()
+    step = np.where(n > cap, (n - 1) / (cap - 1), 1.0)
+    on_grid = np.round(np.round(pos / step) * step) == pos
+    return df[(n <= cap) | on_grid]
@@ -0,0 +1,199 @@
+from types import MappingProxyType
+
+import numpy as np
+import plotly.graph_objects as go
+
+CEO_HOVERTEMPLATE = (
+    '<b>CEO Name:</b> %{customdata[2]}<br>' +
+    '<b>Total Compensation:</b> $%{y:,.0f}<br>' +
+    '<b>Compensation:</b> $%{customdata[0]:,.0f}<br>' +
+    '<b>Other Compensation:</b> $%{customdata[1]:,.0f}<br>' +
+    '<extra></extra>'
+)
+
+HOVERLABEL = dict(
+    bgcolor='white',
+    font=dict(color='black', size=12),
+    bordercolor='black'
+)
+
+
+def financial_hovertemplate(variable):
+    """Hover text for a financial variable chart"""
+    return ('<b>Year:</b> %{x}<br>' +
+            f'<b>{variable}:</b> $%{{y:,.0f}}<br>' +
+            '<extra></extra>')
+
+
+# Green dashed lines for CEO changes, brown for mergers/acquisitions
+EVENT_COLORS = {'ceo_change': 'green', 'm_or_a': 'brown'}
+
+EVENT_ANNOTATIONS = (
+    dict(
+        text="Green dashed lines = CEO Changes",
+        x=0.02, y=0.98,
+        xref="paper", yref="paper",
+        showarrow=False,
+        font=dict(color="green", size=12),
+        bgcolor="rgba(255,255,255,0.8)"
+    ),
+    dict(
+        text="Brown dashed lines = Merger/Acquisition",
+        x=0.02, y=0.93,
+        xref="paper", yref="paper",
+        showarrow=False,
+        font=dict(color="brown", size=12),
+        bgcolor="rgba(255,255,255,0.8)"
+    ),
+)
+
+
+def build_event_shapes(event_table):
+    """Prebuild the layout.shapes list of vertical event lines for every credit union.
+
+    Args:
+        event_table (pd.DataFrame): Output of dashboard_data.build_event_table.
+    Returns:
+        MappingProxyType: {ein: tuple of shape dicts}
+    """
+    shapes = {}
+    for ein, x, event in zip(event_table['ein'], event_table['x'], event_table['event']):
+        shapes.setdefault(ein, []).append(dict(
+            type="line", x0=x, x1=x, xref="x",
+            y0=0, y1=1, yref="y domain",
+            line=dict(color=EVENT_COLORS[event], width=3, dash="dash")
+        ))
+    return MappingProxyType({ein: tuple(cu_shapes) for ein, cu_shapes in shapes.items()})
+
+
+def percentile_band_traces(band, peer_label):
+    """Shaded 10th-90th and 25th-75th percentile bands plus a dashed median line.
+
+    Args:
+        band (pd.DataFrame): Year and p10..p90 columns from dashboard_data.build_percentile_bands.
+        peer_label (str): Peer group name shown in the legend and hover text.
+    Returns:
+        list: Scatter traces, to be drawn underneath the credit union's own line.
+    """
+    traces = []
+    for low, high, fillcolor in [('p10', 'p90', 'rgba(128,128,128,0.15)'),
+                                 ('p25', 'p75', 'rgba(128,128,128,0.3)')]:
+        traces.append(go.Scatter(
+            x=band['Year'], y=band[low],
+            mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'
+        ))
+        traces.append(go.Scatter(
+            x=band['Year'], y=band[high],
+            mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor=fillcolor,
+            name=f"{peer_label}: {low[1:]}th-{high[1:]}th percentile",
+            hoverinfo='skip'
+        ))
+    traces.append(go.Scatter(
+        x=band['Year'], y=band['p50'],
+        mode='lines', line=dict(color='gray', dash='dash'),
+        name=f"{peer_label}: median",
+        hovertemplate=f'<b>{peer_label} median:</b> $%{{y:,.0f}}<extra></extra>'
+    ))
+    return traces
+
+
+def build_figure(x, y, name, title, yaxis_title, height, hovertemplate,
+                 customdata=None, line_color=None, event_shapes=None, tick0=None,
+                 band=None, band_label=None):
+    """Build one dashboard line chart.
+
+    Args:
+        x, y (array-like): Years and values to plot.
+        name (str): Trace name.
+        title (str): Figure title.
+        yaxis_title (str): Y axis label.
+        height (int): Figure height in pixels.
+        hovertemplate (str): Plotly hover template for the trace.
+        customdata (array-like, optional): Extra per-point values for the hover template.
+        line_color (str, optional): Line color.
+        event_shapes (tuple, optional): Prebuilt vertical event lines from
+            build_event_shapes. None skips the event overlay.
+        tick0 (int, optional): First x axis tick.
+        band (pd.DataFrame, optional): Peer percentile band to draw behind the line.
+        band_label (str, optional): Peer group name for the band.
+    Returns:
+        go.Figure
+    """
+    layout = dict(
+        title=title,
+        xaxis=dict(title='Year', tickmode='linear', dtick=1, tick0=tick0, tickformat='d'),
+        yaxis_title=yaxis_title,
+        height=height,
+        hoverlabel=HOVERLABEL
+    )
+    if event_shapes is not None:
+        layout['shapes'] = list(event_shapes)
+        layout['annotations'] = list(EVENT_ANNOTATIONS)
+    trace = go.Scatter(
+        x=x,
+        y=y,
+        name=name,
+        line=dict(color=line_color),
+        hovertemplate=hovertemplate,
+        customdata=customdata,
+    )
+    data = [trace]
+    if band is not None:
+        data = percentile_band_traces(band, band_label) + data
+    return go.Figure(data=data, layout=layout)
+
+
+def nan_separated(keys, x, y, text):
+    """Join series sorted by key into single x/y/text arrays with a NaN gap between series,
+    so plotly draws them as separate lines from one trace"""
+    keys = np.asarray(keys, dtype=object)
+    breaks = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    return (np.insert(np.asarray(x, dtype=float), breaks, np.nan),
+            np.insert(np.asarray(y, dtype=float), breaks, np.nan),
+            np.insert(np.asarray(text, dtype=object), breaks, None))
+
+
+def build_overview_figure(groups, title, yaxis_title, highlight=None, height=600):
+    """WebGL overview of every credit union, one merged trace per group.
+
+    Args:
+        groups (list): (label, keys, x, y, text) tuples; each group's rows sorted
+            by series key, then year. `text` is the hover name of each point.
+        title (str): Figure title.
+        yaxis_title (str): Y axis label.
+        highlight (tuple, optional): (name, x, y) of a credit union drawn on top.
+        height (int): Figure height in pixels.
+    Returns:
+        go.Figure
+    """
+    traces = []
+    for label, keys, x, y, text in groups:
+        x, y, text = nan_separated(keys, x, y, text)
+        traces.append(go.Scattergl(
+            x=x, y=y, text=text,
+            mode='lines',
+            name=label,
+            opacity=0.5,
+            line=dict(width=1),
+            connectgaps=False,
+            hovertemplate='<b>%{text}</b><br><b>Year:</b> %{x}<br>$%{y:,.0f}<extra></extra>'
+        ))
+    if highlight is not None:
+        name, x, y = highlight
+        traces.append(go.Scattergl(
+            x=x, y=y,
+            mode='lines+markers',
+            name=name,
+            line=dict(color='black', width=3),
+            hovertemplate=f'<b>{name}</b><br><b>Year:</b> %{{x}}<br>$%{{y:,.0f}}<extra></extra>'
+        ))
+    layout = dict(
+        title=title,
+        xaxis=dict(title='Year', tickmode='linear', dtick=1, tickformat='d'),
+        yaxis_title=yaxis_title,
+        height=height,
+        hoverlabel=HOVERLABEL
+    )
+    return go.Figure(data=traces, layout=layout)
@@ -0,0 +1,74 @@
+# Startup helpers for credit_union_app.py. Nothing heavier than the standard
+# library is imported here, so the page shell and the credit union dropdown can
+# render before pandas and plotly are loaded.
+import json
+import os
+import time
+
+from sidecar_cache import SIDECAR_DIR
+
+# Monotonic reference for time-to-first-interactive, taken when the app first
+# imports this module in a server process
+PROCESS_START = time.perf_counter()
+STARTUP_TIMINGS = {}
+# Seconds spent loading each sheet (import, read, index, freeze) in this process
+LOAD_TIMINGS = {}
+_reported = False
+
+
+def name_index_path(workbook_path):
+    """Return the path of the prebuilt credit union name index for a workbook"""
+    workbook_path = os.path.abspath(workbook_path)
+    base = os.path.basename(workbook_path)
+    return os.path.join(os.path.dirname(workbook_path), SIDECAR_DIR, f"{base}.names.json")
+
+
+def workbook_key(workbook_path):
+    """mtime/size key used to tell whether the name index still matches the workbook"""
+    stat = os.stat(workbook_path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def read_name_index(workbook_path):
+    """Read the prebuilt {dropdown label: ein} index, or None if missing or stale"""
+    try:
+        with open(name_index_path(workbook_path)) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored.get("workbook") != workbook_key(workbook_path):
+        return None
+    return stored.get("labels")
+
+
+def write_name_index(workbook_path, labels, key):
+    """Write the {dropdown label: ein} index atomically.
+
+    Args:
+        workbook_path (str): Workbook the names were read from.
+        labels (dict): {credit union label: ein}, in dropdown order.
+        key (dict): workbook_key() taken before the workbook was read.
+    """
+    path = name_index_path(workbook_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"workbook": key, "labels": labels}, f)
+    os.replace(tmp_path, path)
+
+
+def record_startup(event):
+    """Record seconds since PROCESS_START for a startup event, once per process"""
+    if event not in STARTUP_TIMINGS:
+        STARTUP_TIMINGS[event] = time.perf_counter() - PROCESS_START
+    return STARTUP_TIMINGS[event]
+
+
+def report_startup():
+    """Print the startup timings to the server log once per process"""
+    global _reported
+    if _reported or 'first_interactive' not in STARTUP_TIMINGS:
+        return
+    _reported = True
+    print(f"Startup: first interactive after {STARTUP_TIMINGS['first_interactive']:.3f}s, "
+          f"data ready after {STARTUP_TIMINGS.get('data_ready', float('nan')):.3f}s")
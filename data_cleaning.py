@@ -1,140 +1,130 @@
 import pandas as pd
 import numpy as np
 
-df = pd.read_excel(
-    r"c:\Users\bchiu\Downloads\credit_union\credit_union_data.xlsx",
-    sheet_name="CEO_Comp",
-    dtype={
-        "name": str,
-        "ein": str,
-        "year": int,
-        "total": float,
-        "ceo_name": str,
-        "compensation": float
-    })
-df = df.dropna(subset=["compensation"])
-# print(df)
-# print(df.isnull().sum())
-# print(df[df['other'].isnull()])
-df = df.fillna(0)
-print(df)
+# M&A events keyed by EIN and year, applied by add_merger_acquisition
+MERGER_EVENTS_FILE = 'merger_events.csv'
 
 def standardize_ceo_names(df):
     """Standardize CEO names by grouping any names that share first or last name,
        then replacing each group with its most frequent name.
-       i.e. 'Richard Brandsma (three matches) and Rick Brandsma (one matches) -> Richard Brandsma'"""
-    for cu in df['name'].unique():
-        cu_df = df[df['name'] == cu]
-        ceo_names = list(cu_df['ceo_name'].unique())
-        if len(ceo_names) <= 1:
-            continue
-
-        # 1. Build adjacency: connect any two names sharing first or last name
-        adj = {name: set() for name in ceo_names}
-        for i, name1 in enumerate(ceo_names):
-            f1, l1 = name1.split()[0].lower(), name1.split()[-1].lower()
-            for name2 in ceo_names[i+1:]:
-                f2, l2 = name2.split()[0].lower(), name2.split()[-1].lower()
-                if f1 == f2 or l1 == l2:
-                    adj[name1].add(name2)
-                    adj[name2].add(name1)
-
-        # 2. Find connected components (groups of linked names) via simple DFS
-        visited = set()
-        for name in ceo_names:
-            if name in visited:
-                continue
-            stack = [name]
-            group = []
-            while stack:
-                curr = stack.pop()
-                if curr in visited:
-                    continue
-                visited.add(curr)
-                group.append(curr)
-                # add its neighbors to explore
-                stack.extend(adj[curr] - visited)
-
-            # 3. In each group, choose the most frequent name from the original counts
-            if len(group) > 1:
-                counts = cu_df['ceo_name'].value_counts()
-                canonical = max(group, key=lambda x: counts.get(x, 0))
-                df.loc[
-                    (df['name'] == cu) & (df['ceo_name'].isin(group)),
-                    'ceo_name'
-                ] = canonical
+       i.e. 'Richard Brandsma (three matches) and Rick Brandsma (one matches) -> Richard Brandsma'
+
+       Every distinct (CU, CEO name) pair is a node, and nodes sharing a
+       (CU, first name) or (CU, last name) key are joined with a vectorized
+       union-find, so no CU is looped over. Ties for most frequent go to the
+       name that appears first."""
+    # 1. One node per distinct (CU, CEO name), numbered by first appearance
+    cu_codes, _ = pd.factorize(df['name'])
+    ceo_codes, ceo_names = pd.factorize(df['ceo_name'])
+    named = (cu_codes >= 0) & (ceo_codes >= 0)
+    row_node = np.full(len(df), -1)
+    row_node[named], pairs = pd.factorize(cu_codes[named].astype(np.int64) * len(ceo_names) + ceo_codes[named])
+    node_cu, node_ceo = pairs // max(len(ceo_names), 1), pairs % max(len(ceo_names), 1)
+    n = len(pairs)
+    if n == 0:
+        return df
+
+    # 2. Keys linking nodes: (CU, first name) and (CU, last name); -1 where a name has no words
+    words = [name.lower().split() if isinstance(name, str) else [] for name in ceo_names]
+    keys = []
+    for part in ([w[0] if w else None for w in words], [w[-1] if w else None for w in words]):
+        part_codes, part_values = pd.factorize(np.array(part, dtype=object))
+        node_part = part_codes[node_ceo]
+        key = np.full(n, -1)
+        linked = node_part >= 0
+        key[linked], _ = pd.factorize(node_cu[linked] * len(part_values) + node_part[linked])
+        keys.append(key)
+
+    # 3. Union-find by min-label propagation: every node takes the lowest label
+    #    among nodes sharing one of its keys, then labels are path-compressed,
+    #    until nothing changes
+    component = np.arange(n)
+    while True:
+        previous = component
+        for key in keys:
+            linked = key >= 0
+            lowest = np.full(max(key.max(), 0) + 1, n)
+            np.minimum.at(lowest, key[linked], component[linked])
+            component = np.where(linked, np.minimum(component, lowest[np.maximum(key, 0)]), component)
+        component = component[component]
+        if np.array_equal(component, previous):
+            break
+
+    # 4. In each component, choose the most frequent name from the original counts
+    counts = np.bincount(row_node[named], minlength=n)
+    order = np.lexsort((np.arange(n), -counts, component))
+    leaders = order[np.r_[True, component[order][1:] != component[order][:-1]]]
+    canonical = np.empty(n, dtype=np.intp)
+    canonical[component[leaders]] = leaders
+    df.loc[named, 'ceo_name'] = ceo_names[node_ceo[canonical[component[row_node[named]]]]]
 
     return df
 
-df_clean = standardize_ceo_names(df)
 def ceo_comparison(df):
     """ Compare CEO names year-over-year for each credit union (CU).
-        Add a column 'ceo_change' that is True if the CEO changed from the previous"""
+        Add a column 'ceo_change' that is True if the CEO changed from the previous,
+        plus, for each CEO's run of years at a CU:
+        'tenure_ordinal' (1 for the first CEO on record, 2 for the next, ...),
+        'tenure_length' (years on record in that tenure) and
+        'prior_ceo' (name of the CEO before, empty for the first tenure)"""
     df_clean = df.copy()
     # 1) Sort so each CU’s years are consecutive
     df_clean = df_clean.sort_values(['name','year'])
-    # 2) Initialize to False
-    df_clean['ceo_change'] = False
-
-    # 3) Loop per CU
-    for cu in df_clean['name'].unique():
-        sub = df_clean[df_clean['name']==cu]  # only this CU
-        idxs = sub.index.tolist()
-        names = sub['ceo_name'].tolist()
-
-        # 4) Compare each year to the prior one (within the same CU!)
-        for i in range(1, len(names)):
-            if names[i] != names[i-1]:
-                df_clean.loc[idxs[i], 'ceo_change'] = True
+
+    # 2) Compare each year to the prior one (within the same CU!) by shifting
+    #    the sorted columns one row; the first row of each CU never counts
+    names = df_clean['name']
+    ceo_names = df_clean['ceo_name']
+    previous = ceo_names.shift()
+    first_year = names.ne(names.shift()).to_numpy()
+    df_clean['ceo_change'] = ceo_names.ne(previous).to_numpy() & ~first_year
+
+    # 3) Tenures: a new one starts at every change
+    tenure = df_clean['ceo_change'].groupby(names, sort=False).cumsum()
+    df_clean['tenure_ordinal'] = tenure + 1
+    df_clean['tenure_length'] = df_clean.groupby([names, tenure], sort=False)['year'].transform('nunique')
+    df_clean['prior_ceo'] = previous.where(df_clean['ceo_change']).groupby(names, sort=False).ffill()
     return df_clean
 
-def add_merger_acquisition(df):
-    """Mark each year as True if the CU had a merger or acquisition that year based on the provided data"""
+def load_merger_events(filename=MERGER_EVENTS_FILE):
+    """Read the M&A events table: one row per event with 'ein' and 'year',
+       an optional 'name' for readability, and any number of attribute
+       columns such as 'acquired_institution' and 'acquired_assets'"""
+    events = pd.read_csv(filename, dtype={'ein': str})
+    events['ein'] = events['ein'].str.strip().str.zfill(9)
+    return events
+
+def add_merger_acquisition(df, events=None):
+    """Mark each year as True if the CU had a merger or acquisition that year based on the provided data.
+       Events are matched on EIN and year with one hash join, and their attribute
+       columns are carried over; several events in one year are combined
+       (numbers summed, text joined with '; ')."""
     df_ma = df.copy()
-    df_ma['m_or_a'] = False  # Initialize to False
-    merger_data = {
-        'Advia Credit Union': [2016, 2017, 2019],
-        'Five Star Credit Union': [2014, 2015],
-        'Greenstate Credit Union': [2020, 2022],
-        'Wings Financial Credit Union': [2020, 2021, 2023],
-        'Achieva Credit Union': [2015, 2018],
-        'Alabama One Credit Union': [2021, 2023],
-        'Avadian Credit Union': [2016, 2022],
-        'Crane Credit Union': [2020, 2021],
-        'Dfcu Financial': [2023],
-        'Fairwinds Credit Union': [2019, 2022],
-        'First Commerce Credit Union': [2014, 2020],
-        'Georgias Own Credit Union': [2018, 2022],
-        'Harborstone Credit Union': [2024],
-        'Lake Michigan Credit Union': [2018, 2021],
-        'Land Of Lincoln Credit Union': [2023],
-        'Lge Community Credit Union': [2018, 2023],
-        'Midflorida Credit Union': [2019],
-        'Numark Credit Union': [2021, 2023],
-        'Royal Credit Union': [2016, 2022],
-        'Sound Credit Union': [2019],
-        'Vystar Credit Union': [2019, 2022]
-    }
-    # Iterate through each row and check if the CU and year match a M&A year
-    for index, row in df_ma.iterrows():
-        cu_name = row['name']
-        year = row['year']
-        if cu_name in merger_data and year in merger_data[cu_name]:
-            df_ma.loc[index, 'm_or_a'] = True
-    return df_ma
+    if events is None:
+        events = load_merger_events()
+    attributes = [column for column in events.columns if column not in ('ein', 'year', 'name')]
+
+    # Key events the same way as the CEO rows, whether they came from the CSV
+    # or were built in memory with int or unpadded EINs
+    event_eins = events['ein'].astype(str).str.strip().str.zfill(9)
+    event_years = events['year'].astype(int)
 
-df_clean = ceo_comparison(df_clean)
-df_clean = add_merger_acquisition(df_clean)
-# pd.set_option('display.max_rows', None)
-# pd.set_option('display.max_columns', None)
-# pd.set_option('display.width', None)
-# pd.set_option('display.max_colwidth', None)
-print(df_clean)
+    # One row per (ein, year) so the join can't duplicate CEO rows
+    by_year = [event_eins, event_years]
+    per_year = events.groupby(by_year).size().rename('m_or_a').to_frame()
+    for column in attributes:
+        values = events[column]
+        if pd.api.types.is_numeric_dtype(values):
+            per_year[column] = values.groupby(by_year).sum(min_count=1)
+        else:
+            per_year[column] = (values.dropna().astype(str) + '; ').groupby(by_year).sum().str[:-2]
 
-df_clean = df_clean.rename(columns={
-    'other': 'other_comp',
-    'total': 'total_comp'
-})
+    keys = pd.MultiIndex.from_arrays([df_ma['ein'].astype(str).str.zfill(9), df_ma['year'].astype(int)])
+    matched = per_year.reindex(keys)
+    df_ma['m_or_a'] = matched['m_or_a'].notna().to_numpy()
+    for column in attributes:
+        df_ma[column] = matched[column].to_numpy()
+    return df_ma
 
 def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
     """Add CEO compensation data as a new sheet to credit union data file"""
@@ -147,4 +137,37 @@ def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
         dataframe.to_excel(filename, sheet_name='CEO_Comp', index=False)
     except Exception as e:
         print(f"Error: {e}")
-add_ceo_sheet(df_clean)
+
+if __name__ == "__main__":
+    df = pd.read_excel(
+        r"c:\Users\bchiu\Downloads\credit_union\credit_union_data.xlsx",
+        sheet_name="CEO_Comp",
+        dtype={
+            "name": str,
+            "ein": str,
+            "year": int,
+            "total": float,
+            "ceo_name": str,
+            "compensation": float
+        })
+    df = df.dropna(subset=["compensation"])
+    # print(df)
+    # print(df.isnull().sum())
+    # print(df[df['other'].isnull()])
+    df = df.fillna(0)
+    print(df)
+
+    df_clean = standardize_ceo_names(df)
+    df_clean = ceo_comparison(df_clean)
+    df_clean = add_merger_acquisition(df_clean)
+    # pd.set_option('display.max_rows', None)
+    # pd.set_option('display.max_columns', None)
+    # pd.set_option('display.width', None)
+    # pd.set_option('display.max_colwidth', None)
+    print(df_clean)
+
+    df_clean = df_clean.rename(columns={
+        'other': 'other_comp',
+        'total': 'total_comp'
+    })
+    add_ceo_sheet(df_clean)
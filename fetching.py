@@ -0,0 +1,293 @@
+import contextlib
+import io
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Overridable so the scrapers can be pointed at fixture_server.py for offline runs
+PROPUBLICA_BASE_URL = os.environ.get("PROPUBLICA_BASE_URL", "https://projects.propublica.org/nonprofits").rstrip("/")
+PROPUBLICA_ORG_URL = PROPUBLICA_BASE_URL + "/organizations/{ein}"
+
+# Statuses worth retrying; 429 and 503 are the host asking us to slow down
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+OVERLOAD_STATUSES = {429, 503}
+# Connection failures worth retrying, including a connection dropped mid-body
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+DEFAULT_RETRIES = 3
+# Base and cap, in seconds, of the jittered exponential backoff between retries
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` requests per second on average,
+    with bursts of up to `burst` requests"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """Additive-increase / multiplicative-decrease limit on requests in flight to one host.
+
+    The limit starts at 2 and grows by one per healthy response until the
+    first failure (slow start), then by about one per round of `limit`
+    responses, up to `max_limit`. A transient failure halves it, once per
+    round: failures of requests that started before the last cut don't cut
+    again. A Retry-After on a 429/503 also pauses every new request to the
+    host until it has passed.
+    """
+
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self.limit = min(2.0, max_limit)
+        self.slow_start = True
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.stats = {"ok": 0, "failed": 0, "backed_off": 0}
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a request may start; returns its start time for release()"""
+        with self.condition:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return time.monotonic()
+                self.condition.wait(wait if wait > 0 else None)
+
+    def release(self, started, failed=False, retry_after=None):
+        """Finish a request started at `started`, adjusting the limit by its outcome"""
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if not failed:
+                self.stats["ok"] += 1
+                self.limit = min(self.max_limit, self.limit + (1 if self.slow_start else 1 / self.limit))
+            else:
+                self.stats["failed"] += 1
+                if started >= self.decreased_at:
+                    self.stats["backed_off"] += 1
+                    self.slow_start = False
+                    self.limit = max(1.0, self.limit / 2)
+                    self.decreased_at = now
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            self.condition.notify_all()
+
+
+_host_controllers = {}
+_host_controllers_lock = threading.Lock()
+
+
+def host_concurrency(url, max_limit):
+    """The AdaptiveConcurrency shared by every fetch to the host of `url`.
+    What one call learns about a host carries over to the next, capped at
+    the new call's `max_limit`."""
+    host = urlsplit(url).netloc
+    with _host_controllers_lock:
+        controller = _host_controllers.get(host)
+        if controller is None:
+            controller = _host_controllers[host] = AdaptiveConcurrency(max_limit)
+        with controller.condition:
+            controller.max_limit = max_limit
+            controller.limit = min(controller.limit, max_limit)
+        return controller
+
+
+def retry_after_seconds(response):
+    """Seconds a response's Retry-After header asks us to wait, or None"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def make_session(pool_size=10):
+    """requests.Session that keeps up to `pool_size` connections per host alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_pages(keys, url_for, max_workers=4, requests_per_second=2.0, session=None, cache=None,
+                retries=DEFAULT_RETRIES):
+    """Fetch one page per key concurrently, yielding results in input order.
+
+    Requests are started no faster than `requests_per_second` (token bucket)
+    over one keep-alive session. How many are in flight adapts to the host
+    (see AdaptiveConcurrency): it grows towards `max_workers` while responses
+    are healthy and is cut when the host answers 429/5xx or the connection
+    fails. Those transient failures are retried up to `retries` times after a
+    jittered exponential backoff, or after the host's Retry-After; other
+    errors, such as a 404, are returned at once.
+
+    Args:
+        keys (list): Keys to fetch, e.g. EINs.
+        url_for (callable): Maps a key to its URL.
+        max_workers (int): Maximum concurrent requests.
+        requests_per_second (float): Average request start rate.
+        session (requests.Session, optional): Session to reuse.
+        cache (http_cache.HttpCache, optional): Response cache. Pages it serves
+            without revalidating don't count against the rate limit.
+        retries (int): Retries of a request after a transient failure.
+    Yields:
+        tuple: (key, content bytes or None, exception or None)
+    """
+    session = session or make_session(max_workers)
+    limiter = TokenBucket(requests_per_second, burst=max_workers)
+
+    def fetch(key):
+        url = url_for(key)
+        controller = host_concurrency(url, max_workers)
+        for attempt in range(retries + 1):
+            started = []
+
+            def start_request():
+                started.append(controller.acquire())
+                limiter.acquire()
+
+            response, error = None, None
+            try:
+                if cache is not None:
+                    response = cache.get(session, url, before_request=start_request)
+                else:
+                    start_request()
+                    response = session.get(url)
+            except TRANSIENT_ERRORS as e:
+                error = e
+            finally:
+                # Also reached when an unexpected error propagates, so the
+                # host's slot is always given back; only a transient failure
+                # counts against the host's concurrency
+                transient = error is not None or (response is not None
+                                                  and response.status_code in TRANSIENT_STATUSES)
+                retry_after = None
+                if response is not None and response.status_code in OVERLOAD_STATUSES:
+                    retry_after = retry_after_seconds(response)
+                if started:
+                    controller.release(started[0], failed=transient, retry_after=retry_after)
+            if not transient or attempt == retries:
+                break
+            # Full jitter keeps the retries of many workers from arriving together;
+            # a Retry-After pause is enforced by the controller on top of this
+            time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+        if error is not None:
+            raise error
+        response.raise_for_status()
+        return response.content
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Submit lazily so at most a few pages wait in memory ahead of the consumer
+        pending = deque()
+        keys = iter(keys)
+        for key in keys:
+            pending.append((key, executor.submit(fetch, key)))
+            if len(pending) >= max_workers * 2:
+                break
+        while pending:
+            key, future = pending.popleft()
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
+            for next_key in keys:
+                pending.append((next_key, executor.submit(fetch, next_key)))
+                break
+
+
+def _parse_captured(parse, content, args):
+    """Run parse(content, *args), returning its result and whatever it printed"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result = parse(content, *args)
+    return result, output.getvalue()
+
+
+def parse_pages(pages, parse, args_for, processes=1):
+    """Parse fetched pages in a process pool, yielding results in input order.
+
+    This is the second stage of the fetch/parse pipeline: fetch_pages threads
+    download pages while up to `processes` worker processes parse earlier ones.
+    At most 2 * `processes` pages wait to be parsed, and the next page is only
+    pulled from `pages` when one is handed back, so memory stays flat however
+    long the EIN list is. Anything `parse` prints is captured and returned, so
+    the caller can print it in input order.
+
+    Args:
+        pages (iterable): (key, content, error) tuples from fetch_pages.
+        parse (callable): Module-level function called as parse(content, *args_for(key)).
+        args_for (callable): Maps a key to the remaining (picklable) arguments of parse.
+        processes (int): Worker processes. 1 parses in this process.
+    Yields:
+        tuple: (key, result or None, exception or None, printed output)
+    """
+    if processes <= 1:
+        for key, content, error in pages:
+            if error:
+                yield key, None, error, ""
+                continue
+            try:
+                result, output = _parse_captured(parse, content, args_for(key))
+            except Exception as e:
+                yield key, None, e, ""
+            else:
+                yield key, result, None, output
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+
+        def finish_oldest():
+            key, future, error = pending.popleft()
+            if error:
+                return key, None, error, ""
+            try:
+                result, output = future.result()
+            except Exception as e:
+                return key, None, e, ""
+            return key, result, None, output
+
+        for key, content, error in pages:
+            future = None if error else pool.submit(_parse_captured, parse, content, args_for(key))
+            pending.append((key, future, error))
+            if len(pending) >= processes * 2:
+                yield finish_oldest()
+        while pending:
+            yield finish_oldest()
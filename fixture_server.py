@@ -0,0 +1,173 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Record/replay HTTP server for running the scrapers and API_requests.py offline.
+#
+#   python fixture_server.py --store fixtures --record     # proxy to ProPublica, saving every response
+#   python fixture_server.py --store fixtures --latency 0.2 --error-rate 0.05
+#   PROPUBLICA_BASE_URL=http://127.0.0.1:8765 python combined_scraper.py --no-cache
+#
+# Paths mirror projects.propublica.org/nonprofits, so PROPUBLICA_BASE_URL is
+# the only setting the scrapers need.
+
+UPSTREAM_URL = "https://projects.propublica.org/nonprofits"
+
+
+class FixtureStore:
+    """Directory of recorded responses, keyed by request path and query.
+
+    Each response body is stored gzip-compressed. index.json maps every
+    path to its body file, status and content type.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        try:
+            with open(os.path.join(path, "index.json")) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def get(self, request_path):
+        """Return (status, content type, body) for a path, or None if it wasn't recorded"""
+        entry = self.index.get(request_path)
+        if entry is None:
+            return None
+        with gzip.open(os.path.join(self.path, entry["file"]), "rb") as f:
+            return entry["status"], entry["content_type"], f.read()
+
+    def put(self, request_path, status, content_type, body):
+        """Save one response and rewrite the index"""
+        name = hashlib.sha256(request_path.encode()).hexdigest() + ".gz"
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(gzip.compress(body))
+        with self.lock:
+            self.index[request_path] = {"file": name, "status": status, "content_type": content_type}
+            tmp_path = os.path.join(self.path, f"index.json.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f, indent=1)
+            os.replace(tmp_path, os.path.join(self.path, "index.json"))
+
+
+def should_record(path, status):
+    """Whether an upstream response is worth replaying: successes, plus the
+    search 404 that means "no match". Rate limits and server errors are
+    passed through without being saved."""
+    if 200 <= status < 300:
+        return True
+    return status == 404 and "/search.json" in path
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves recorded responses. Settings are read from the server object:
+    store, upstream (record mode when set), latency, jitter, error_rate,
+    error_status and retry_after."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if server.error_rate and random.random() < server.error_rate:
+            headers = {"Retry-After": str(server.retry_after)} if server.error_status in (429, 503) else {}
+            self.respond(server.error_status, "text/plain", b"Injected error", headers)
+            return
+
+        fixture = server.store.get(self.path)
+        if fixture is None and server.upstream:
+            response = server.session.get(server.upstream + self.path)
+            fixture = (response.status_code, response.headers.get("Content-Type", ""), response.content)
+            if not should_record(self.path, response.status_code):
+                retry_after = response.headers.get("Retry-After")
+                self.respond(*fixture, {"Retry-After": retry_after} if retry_after else None)
+                return
+            server.store.put(self.path, *fixture)
+        if fixture is None:
+            self.respond(404, "text/plain", b"Not recorded")
+            return
+        self.respond(*fixture)
+
+    def respond(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_server(store_path, port=0, record=False, upstream=UPSTREAM_URL, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, retry_after=1, verbose=False):
+    """Start a fixture server on a background thread.
+    Args:
+        store_path (str): Fixture store directory.
+        port (int): Port to listen on; 0 picks a free one.
+        record (bool): Forward requests that aren't recorded yet to `upstream` and save the ones worth replaying (see should_record).
+        latency (float): Seconds added to every response.
+        jitter (float): Up to this many extra seconds, uniformly random.
+        error_rate (float): Fraction of requests answered with `error_status` instead.
+        error_status (int): Status of injected errors. 429 and 503 carry Retry-After.
+        retry_after (int): Retry-After seconds sent with injected 429/503 responses.
+    Returns:
+        ThreadingHTTPServer: Running server; its base URL is in `server.base_url`.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.daemon_threads = True
+    server.store = FixtureStore(store_path)
+    server.upstream = upstream.rstrip("/") if record else None
+    server.session = requests.Session()
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.retry_after = retry_after
+    server.verbose = verbose
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay server for ProPublica responses")
+    parser.add_argument('--store', default='fixtures', help="Fixture store directory")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--record', action='store_true', help="Proxy unrecorded requests upstream and save them")
+    parser.add_argument('--upstream', default=UPSTREAM_URL, help="Site recorded from in --record mode")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=503, help="Status code of injected errors")
+    parser.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds on injected 429/503")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = start_server(args.store, args.port, args.record, args.upstream, args.latency, args.jitter,
+                          args.error_rate, args.error_status, args.retry_after, args.verbose)
+    mode = f"recording from {args.upstream}" if args.record else "replaying"
+    print(f"Serving {len(server.store.index)} fixtures from {args.store} ({mode}) at {server.base_url}")
+    print(f"Point the scrapers at it with PROPUBLICA_BASE_URL={server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# On-disk HTTP response cache shared by the scrapers and API_requests.py.
+# Bodies are stored gzip-compressed next to a small JSON file holding the
+# validators (ETag / Last-Modified) used for conditional GETs.
+
+HTTP_CACHE_DIR = ".http_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class HttpCache:
+    """Persistent cache of successful GET responses, keyed by URL and query.
+
+    Entries younger than `max_age` seconds are served without touching the
+    network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 instead of a full
+    download. When the compressed bodies grow past `max_bytes`, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_age=0, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._size = None
+        self.stats = {"fresh": 0, "revalidated": 0, "downloaded": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url, params):
+        key = json.dumps([url, sorted((params or {}).items())])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return f"{base}.json", f"{base}.gz"
+
+    def _read(self, url, params):
+        meta_path, body_path = self._paths(url, params)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, EOFError):
+            return None, None
+        return meta, body
+
+    def _write(self, url, params, response):
+        meta_path, body_path = self._paths(url, params)
+        meta = {
+            "url": response.url,
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding,
+        }
+        compressed = gzip.compress(response.content)
+        # Write body then metadata, each atomically, so readers never see a partial entry
+        with self.lock:
+            old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            for path, data, mode in [(body_path, compressed, "wb"), (meta_path, json.dumps(meta), "w")]:
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, mode) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            if self._size is not None:
+                self._size += len(compressed) - old_size
+        self._evict()
+
+    def _touch(self, url, params, refreshed=False):
+        """Mark an entry as recently used (and, after a 304, as freshly validated)"""
+        meta_path, body_path = self._paths(url, params)
+        try:
+            os.utime(body_path)
+            if refreshed:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                meta["fetched_at"] = time.time()
+                tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(meta, f)
+                os.replace(tmp_path, meta_path)
+        except (OSError, ValueError):
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the bodies fit in max_bytes"""
+        with self.lock:
+            if self._size is None:
+                self._size = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                                 if entry.name.endswith(".gz"))
+            if self._size <= self.max_bytes:
+                return
+            bodies = sorted((entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".gz")),
+                            key=lambda entry: entry.stat().st_mtime)
+            for entry in bodies:
+                if self._size <= self.max_bytes:
+                    break
+                self._size -= entry.stat().st_size
+                for path in [entry.path, entry.path[:-len(".gz")] + ".json"]:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def _count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def get(self, session, url, params=None, before_request=None, **kwargs):
+        """GET a URL through the cache.
+        Args:
+            session (requests.Session): Session used when the network is needed.
+            url (str): URL to fetch.
+            params (dict, optional): Query parameters, part of the cache key.
+            before_request (callable, optional): Called right before a network
+                request, e.g. to take a rate-limiter token. Not called when the
+                response is served from the cache without revalidation.
+            **kwargs: Passed on to session.get.
+        Returns:
+            requests.Response: The live response, or one rebuilt from the cache.
+        """
+        meta, body = self._read(url, params)
+        if meta is not None and time.time() - meta["fetched_at"] < self.max_age:
+            self._touch(url, params)
+            self._count("fresh")
+            return cached_response(meta, body)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        if before_request is not None:
+            before_request()
+        response = session.get(url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            self._touch(url, params, refreshed=True)
+            self._count("revalidated")
+            return cached_response(meta, body)
+        if response.status_code == 200:
+            self._write(url, params, response)
+            self._count("downloaded")
+        return response
+
+
+def cached_response(meta, body):
+    """Rebuild a requests.Response from a cache entry"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = meta["url"]
+    response._content = body
+    response.encoding = meta.get("encoding")
+    response.headers = CaseInsensitiveDict({"Content-Type": meta.get("content_type") or ""})
+    return response
+
+
+def add_cache_arguments(parser):
+    """Add the shared --cache-dir / --max-age / --cache-size / --no-cache options to a script"""
+    parser.add_argument('--cache-dir', default=HTTP_CACHE_DIR, help="Directory for cached responses")
+    parser.add_argument('--max-age', type=float, default=0,
+                        help="Serve cached responses younger than this many seconds without revalidating")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Maximum size of the cache in MB")
+    parser.add_argument('--no-cache', action='store_true', help="Always download, bypassing the cache")
+
+
+def cache_from_args(args):
+    """Build the HttpCache selected by add_cache_arguments options, or None for --no-cache"""
+    if args.no_cache:
+        return None
+    return HttpCache(args.cache_dir, max_age=args.max_age, max_bytes=args.cache_size * 1024 * 1024)
@@ -1,88 +1,112 @@
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import pandas as pd
-import time
 import re
+from http_cache import add_cache_arguments, cache_from_args
+from propublica_pages import DEFAULT_HTML_PARSER, filing_sections, org_name_from_soup, parse_org_html
+from scrape_state import (CheckpointLog, add_scraper_arguments, checkpoint_path, merge_with_stored,
+                          read_stored_sheet, scrape_eins, stored_filing_years)
 
 
-def financial_scraper(ein_list):
+# Credit unions that aren't in API
+multi_year_eins = ["420804594", "350978599", "590729366"]  # Greenstate, Crane, and Achieva Credit Union
+# Columns of each financial record
+FINANCIAL_COLUMNS = ['ein', 'name', 'Year', 'Total Revenue', 'Total Expenses', 'Net Income',
+                     'Total Assets', 'Total Liabilities', 'Investment Income']
+
+
+def financial_scraper(ein_list, max_workers=4, requests_per_second=2.0, cache=None,
+                      html_parser=DEFAULT_HTML_PARSER, stored_years=None, checkpoint=None,
+                      processes=1):
     """Scrapes financial data from ProPublica Nonprofits site for given EINs.
     Args:
         ein_list (list): List of EINs to scrape financial data for.
+        max_workers (int): Maximum number of pages fetched at once.
+        requests_per_second (float): Average rate at which requests are started.
+        cache (http_cache.HttpCache, optional): On-disk response cache.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        stored_years (dict, optional): {ein: years} already captured by an earlier
+            run. Those years are skipped, and EINs with every year captured aren't fetched.
+        checkpoint (scrape_state.CheckpointLog, optional): Log each finished EIN's
+            records are appended to. EINs already in it are not scraped again.
+        processes (int): Worker processes parsing pages while later ones download.
     Returns:
         pd.DataFrame: DataFrame containing financial data for each EIN.
     """
+    stored_years = stored_years or {}
+    ein_list = [ein for ein in ein_list if years_to_scrape(ein, stored_years.get(ein, ()))]
+    records_by_ein = scrape_eins(
+        ein_list, parse_financial_page, lambda ein: (ein, html_parser, stored_years.get(ein, ())),
+        # Empty records for the years a failed EIN should have covered
+        lambda ein: [empty_financial_record(ein, f"Unknown ({ein})", year)
+                     for year in years_to_scrape(ein, stored_years.get(ein, ()))],
+        ('financial',), checkpoint=checkpoint, processes=processes,
+        max_workers=max_workers, requests_per_second=requests_per_second, cache=cache)
+    return pd.DataFrame([record for ein in ein_list for record in records_by_ein[ein]])
+
+
+def years_to_scrape(ein, skip_years=()):
+    """Filing years to scrape for an EIN, leaving out years already captured"""
+    if ein in multi_year_eins:
+        years = range(2012, 2024)
+    else:
+        years = [2023]  # Just 2023
+    return [year for year in years if year not in skip_years]
+
+
+def parse_financial_page(content, ein, html_parser=DEFAULT_HTML_PARSER, skip_years=()):
+    """Extract financial records for an EIN's filing years from an organization page.
+    Args:
+        content (bytes): HTML of the ProPublica organization page.
+        ein (str): EIN of the organization.
+        html_parser (str): Parser backend, one of propublica_pages.HTML_PARSERS.
+        skip_years (set, optional): Years already captured; no records are made for them.
+    Returns:
+        list: Financial records, with empty records for years without data.
+    """
+    soup = parse_org_html(content, html_parser)
+    org_name = org_name_from_soup(soup, ein)
+    print(f"Found organization: {org_name}")
+    return financial_records(filing_sections(soup), ein, org_name, skip_years)
+
+
+def financial_records(sections, ein, org_name, skip_years=()):
+    """Extract financial records for an EIN's filing years from a page's filing sections.
+    Args:
+        sections (list): (year, section) pairs from propublica_pages.filing_sections.
+        ein (str): EIN of the organization.
+        org_name (str): Organization name.
+        skip_years (set, optional): Years already captured; no records are made for them.
+    Returns:
+        list: Financial records, with empty records for years without data.
+    """
     results = []
-    
-    # Credit unions that aren't in API
-    multi_year_eins = ["420804594", "350978599", "590729366"]  # Greenstate, Crane, and Achieva Credit Union
-    
-    for ein in ein_list:
-        print(f"Processing EIN: {ein}")
-        url = f"https://projects.propublica.org/nonprofits/organizations/{ein}"
-        
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Get org name
-            h1_element = soup.find('h1')
-            if h1_element:
-                h1_text = h1_element.text.strip().lower()
-    
-                # Check if header contains generic terms
-                if any(term in h1_text for term in ['chartered in', 'credit unions in']):
-                    # Extract from the specific div class to get sub name
-                    org_div = soup.find('div', class_='text-hed-900 org-sort-name')
-                    if org_div:
-                        org_name = org_div.text.strip()
-                        fixed_name = re.sub(r'^\d+\s+', '', org_name).strip()
-                        org_name = fixed_name
-                    else:
-                        org_name = f"Unknown ({ein})"
-                else:
-                    # Use h1 as normal
-                    org_name = h1_element.text.strip()
-            else:
-                org_name = f"Unknown ({ein})"
-            print(f"Found organization: {org_name}")
+    # First section for each year, as soup.find would return
+    sections_by_year = {}
+    for year, section in sections:
+        sections_by_year.setdefault(year, section)
             
-            # Determine which years to scrape
-            if ein in multi_year_eins:
-                years_to_scrape = list(range(2012, 2024)) 
-                print(f"Multi-year scraping: {years_to_scrape[0]}-{years_to_scrape[-1]}")
-            else:
-                years_to_scrape = [2023]  # Just 2023
-                print(f"Single year scraping: 2023")
+    # Determine which years to scrape
+    years = years_to_scrape(ein, skip_years)
+    if len(years) > 1:
+        print(f"Multi-year scraping: {years[0]}-{years[-1]}")
+    elif years:
+        print(f"Single year scraping: {years[0]}")
             
-            # Process each year
-            for year in years_to_scrape:
-                filing_section = soup.find('section', id=f'filing{year}')
+    # Process each year
+    for year in years:
+        filing_section = sections_by_year.get(year)
                 
-                if filing_section:
-                    financial_data = extract_financial_data(filing_section, ein, org_name, year)
-                    if financial_data:
-                        results.append(financial_data)
-                    else:
-                        results.append(empty_financial_record(ein, org_name, year))
-                        print(f"{year}: Failed to extract financial data")
-                else:
-                    results.append(empty_financial_record(ein, org_name, year))
-                    print(f"{year}: No filing section found")
-                    
-        except Exception as e:
-            print(f"Error processing EIN {ein}: {e}")
-            # Add empty records for the years this EIN should have covered
-            if ein in multi_year_eins:
-                for year in range(2012, 2024):
-                    results.append(empty_financial_record(ein, f"Unknown ({ein})", year))
+        if filing_section:
+            financial_data = extract_financial_data(filing_section, ein, org_name, year)
+            if financial_data:
+                results.append(financial_data)
             else:
-                results.append(empty_financial_record(ein, f"Unknown ({ein})", 2023))
-                
-        time.sleep(1)
-        
-    return pd.DataFrame(results)
+                results.append(empty_financial_record(ein, org_name, year))
+                print(f"{year}: Failed to extract financial data")
+        else:
+            results.append(empty_financial_record(ein, org_name, year))
+            print(f"{year}: No filing section found")
+    return results
 
 
 def extract_financial_data(filing_section, ein, org_name, year):
@@ -215,17 +239,6 @@ ein_list = [
     "590690965"
 ]
 
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', None)
-
-# Run the scraper
-df = financial_scraper(ein_list)
-print("\nResults:")
-df = df[df['Total Revenue'].notnull()]
-print(df)
-
 def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
     """Add CEO compensation data as a new sheet to credit union data file"""
     try:
@@ -237,5 +250,31 @@ def add_ceo_sheet(dataframe, filename='credit_union_data.xlsx'):
         dataframe.to_excel(filename, sheet_name='Financial_remaining', index=False)
     except Exception as e:
         print(f"Error: {e}")
-        
-add_ceo_sheet(df)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape financial data from ProPublica Nonprofits")
+    add_scraper_arguments(parser, "Only extract filing years not already in the Financial_remaining sheet")
+    add_cache_arguments(parser)
+    args = parser.parse_args()
+    cache = cache_from_args(args)
+
+    pd.set_option('display.max_rows', None)
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', None)
+    pd.set_option('display.max_colwidth', None)
+
+    # Run the scraper
+    stored = None
+    if args.incremental:
+        stored = read_stored_sheet('credit_union_data.xlsx', 'Financial_remaining', FINANCIAL_COLUMNS)
+    with CheckpointLog(checkpoint_path('overall_cu_scraper'), resume=args.resume) as checkpoint:
+        df = financial_scraper(ein_list, max_workers=args.workers, requests_per_second=args.rate,
+                               cache=cache, html_parser=args.parser,
+                               stored_years=stored_filing_years(stored, 'Year', 'Total Revenue'),
+                               checkpoint=checkpoint, processes=args.processes)
+    print("\nResults:")
+    if not df.empty:
+        df = df[df['Total Revenue'].notnull()]
+    print(df)
+    add_ceo_sheet(merge_with_stored(df, stored, 'Year'))
+
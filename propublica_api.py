@@ -0,0 +1,179 @@
+import json
+import os
+import re
+import time
+from urllib.parse import quote_plus
+
+import numpy as np
+import pandas as pd
+import requests
+
+from fetching import PROPUBLICA_BASE_URL, fetch_pages
+
+# Client for the ProPublica Nonprofit Explorer API used by API_requests.py
+
+PROPUBLICA_API_URL = f"{PROPUBLICA_BASE_URL}/api/v2"
+NAME_MEMO_PATH = ".propublica_names.json"
+# Name -> EIN matches almost never change; search again after 30 days
+NAME_MEMO_TTL = 30 * 24 * 60 * 60
+
+# The only filings_with_data fields read, and the column each one becomes
+FILING_FIELDS = {
+    "tax_prd_yr": "Year",
+    "totassetsend": "Total Assets",
+    "totliabend": "Total Liabilities",
+    "totrevenue": "Total Revenue",
+    "totfuncexpns": "Total Expenses",
+    "invstmntinc": "Investment Income",
+}
+
+
+def search_url(name):
+    """URL of the organization search for a name"""
+    return f"{PROPUBLICA_API_URL}/search.json?q={quote_plus(name)}"
+
+
+def organization_url(ein):
+    """URL of the organization JSON (with filings) for an EIN"""
+    return f"{PROPUBLICA_API_URL}/organizations/{ein}.json"
+
+
+class NameMemo:
+    """Persistent name -> (EIN, canonical name) table with a time-to-live.
+
+    Names the search didn't find are remembered too, as (None, None), so a
+    repeat run makes no search requests at all until entries expire.
+    """
+
+    def __init__(self, path=NAME_MEMO_PATH, ttl=NAME_MEMO_TTL):
+        self.path = path
+        self.ttl = ttl
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, name):
+        """Return the memoized (ein, canonical name), or None if missing or expired"""
+        entry = self.entries.get(name)
+        if entry is None or time.time() - entry["looked_up_at"] > self.ttl:
+            return None
+        return entry["ein"], entry["name"]
+
+    def put(self, name, ein, canonical_name):
+        self.entries[name] = {"ein": ein, "name": canonical_name, "looked_up_at": time.time()}
+
+    def save(self):
+        """Write the table atomically"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def lookup_eins(names, memo=None, max_workers=4, requests_per_second=2.0, session=None, cache=None):
+    """Find the EIN and canonical name of each credit union, searching concurrently.
+    Args:
+        names (list): Credit union names, e.g. cu_list.
+        memo (NameMemo, optional): Memo table; names found in it aren't searched
+            and new results are saved to it.
+        max_workers (int): Maximum concurrent searches.
+        requests_per_second (float): Average rate at which searches are started.
+        session (requests.Session, optional): Pooled session to reuse.
+        cache (http_cache.HttpCache, optional): On-disk response cache.
+    Returns:
+        dict: {name: (ein, canonical name)}, (None, None) for names not found.
+    """
+    found = {}
+    to_search = []
+    for name in names:
+        memoized = memo.get(name) if memo is not None else None
+        if memoized is not None:
+            found[name] = memoized
+        else:
+            to_search.append(name)
+
+    pages = fetch_pages(to_search, search_url, max_workers=max_workers,
+                        requests_per_second=requests_per_second, session=session, cache=cache)
+    for name, content, error in pages:
+        # The search endpoint answers 404 when nothing matches
+        if isinstance(error, requests.HTTPError) and error.response.status_code == 404:
+            content, error = b"{}", None
+        if error:
+            print(f"Error searching for {name}: {error}")
+            found[name] = (None, None)
+            continue
+        organizations = json.loads(content).get("organizations")
+        if organizations:
+            found[name] = (organizations[0].get("ein"), organizations[0]["name"])
+        else:
+            found[name] = (None, None)
+        if memo is not None:
+            memo.put(name, *found[name])
+
+    if memo is not None and to_search:
+        memo.save()
+    return {name: found[name] for name in names}
+
+
+def fetch_organizations(eins, max_workers=4, requests_per_second=2.0, session=None, cache=None):
+    """Fetch the organization JSON of each EIN concurrently, in input order.
+    Yields:
+        tuple: (ein, parsed JSON dict or None, exception or None)
+    """
+    pages = fetch_pages(eins, organization_url, max_workers=max_workers,
+                        requests_per_second=requests_per_second, session=session, cache=cache)
+    for ein, content, error in pages:
+        yield ein, (json.loads(content) if content is not None else None), error
+
+
+def organization_name(organization):
+    """Name of an organization, using sort_name when the name is a generic
+    "Credit Unions in ..." / "... chartered in ..." header"""
+    name = organization.get("name", "")
+    print("Org name:", name.lower())
+    if any(substr in name.lower() for substr in ["chartered in", "credit unions in"]):
+        if "sort_name" in organization:
+            name = re.sub(r'^\d+\s+', '', organization["sort_name"]).strip()
+            print("Fixed name:", name)
+    return name
+
+
+class FilingTable:
+    """Column-wise accumulator of filing rows for a batch of organizations.
+
+    add() reads only FILING_FIELDS from each filing into plain lists, with the
+    organization's name and EIN repeated per row; to_frame() builds a single
+    typed DataFrame for the whole batch at the end.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.eins = []
+        self.fields = {field: [] for field in FILING_FIELDS}
+
+    def add(self, data):
+        """Add one organization's filings from its API JSON; returns the number of rows added"""
+        filings = data.get("filings_with_data") or []
+        if not filings:
+            return 0
+        organization = data.get("organization", {})
+        name = organization_name(organization)
+        self.names.extend([name] * len(filings))
+        self.eins.extend([organization.get("ein")] * len(filings))
+        for field, values in self.fields.items():
+            values.extend(filing.get(field) for filing in filings)
+        return len(filings)
+
+    def to_frame(self):
+        """DataFrame with name, ein, Year and the financial columns"""
+        columns = {"name": self.names, "ein": self.eins}
+        for field, values in self.fields.items():
+            column = FILING_FIELDS[field]
+            if column == "Year":
+                # Nullable, so a filing without tax_prd_yr keeps its row
+                columns[column] = pd.array(values, dtype="Int64")
+            else:
+                columns[column] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        return pd.DataFrame(columns)
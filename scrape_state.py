@@ -0,0 +1,191 @@
+import json
+import os
+
+import pandas as pd
+
+from fetching import PROPUBLICA_ORG_URL, fetch_pages, parse_pages
+from propublica_pages import DEFAULT_HTML_PARSER, HTML_PARSERS
+
+# What earlier scraper runs already stored, so later runs only extract new
+# filings, per-EIN checkpoints so an interrupted run can resume, and the
+# fetch/parse/checkpoint loop and command-line options the scrapers share
+
+CHECKPOINT_DIR = ".scrape_checkpoints"
+# Columns data_cleaning.py renames when it rewrites CEO_Comp, by scraper name
+CLEANED_COLUMN_NAMES = {'other': 'other_comp', 'total': 'total_comp'}
+
+
+def read_stored_sheet(filename, sheet_name, columns=None):
+    """Read a sheet written by an earlier scraper run, or None if there isn't one yet.
+    Args:
+        filename (str): Workbook path.
+        sheet_name (str): Sheet to read.
+        columns (list, optional): The scraper's own columns. The sheet is mapped
+            back to them: columns renamed by data_cleaning.py get their scraper
+            names again, and columns it derived (ceo_change, m_or_a, ...) are
+            dropped, so merging with new records doesn't mix the two schemas.
+    Returns:
+        pd.DataFrame: The stored records, or None.
+    """
+    try:
+        df = pd.read_excel(filename, sheet_name=sheet_name, dtype={'ein': str})
+    except (FileNotFoundError, ValueError):
+        return None
+    if columns is not None:
+        df = df.rename(columns={cleaned: raw for raw, cleaned in CLEANED_COLUMN_NAMES.items()
+                                if raw in columns and raw not in df.columns})
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Sheet '{sheet_name}' of {filename} has no {', '.join(missing)} column; "
+                             "it can't be used for an incremental run")
+        df = df[columns]
+    # EINs written as numbers lose their leading zeros
+    df['ein'] = df['ein'].str.zfill(9)
+    return df
+
+
+def stored_filing_years(stored, year_column, value_column):
+    """Collect the filing years already captured for each EIN.
+    Args:
+        stored (pd.DataFrame): Sheet from read_stored_sheet, or None.
+        year_column (str): Column holding the filing year ('year' or 'Year').
+        value_column (str): Column that is only filled for captured filings;
+            empty placeholder records don't count, so their years are retried.
+    Returns:
+        dict: {ein: set of years}
+    """
+    if stored is None:
+        return {}
+    captured = stored[stored[value_column].notnull()]
+    years = {}
+    for ein, year in zip(captured['ein'], captured[year_column]):
+        years.setdefault(ein, set()).add(int(year))
+    return years
+
+
+def merge_with_stored(new, stored, year_column):
+    """Combine newly scraped records with the stored sheet, new records winning.
+    Args:
+        new (pd.DataFrame): Records from this run.
+        stored (pd.DataFrame): Sheet from read_stored_sheet, or None.
+        year_column (str): Column holding the filing year.
+    Returns:
+        pd.DataFrame: All records, one per (ein, year), sorted by EIN and year.
+    """
+    if stored is None or stored.empty:
+        return new
+    if new.empty:
+        return stored
+    combined = pd.concat([new, stored], ignore_index=True)
+    combined = combined.drop_duplicates(subset=['ein', year_column], keep='first')
+    return combined.sort_values(['ein', year_column], kind='stable').reset_index(drop=True)
+
+
+def checkpoint_path(scraper_name, checkpoint_dir=CHECKPOINT_DIR):
+    """Return the checkpoint log path for one scraper script"""
+    return os.path.join(checkpoint_dir, f"{scraper_name}.jsonl")
+
+
+class CheckpointLog:
+    """Append-only JSONL log with one line per finished EIN.
+
+    Each line is written and fsynced as soon as the EIN's records are
+    extracted, so a crash loses at most the EIN in progress. A fresh log is
+    started unless `resume` is set; when resuming, the EINs already in the
+    log are available in `completed` and a partially written last line is
+    dropped.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if resume and os.path.exists(path):
+            good_bytes = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    self.completed[entry.pop("ein")] = entry
+                    good_bytes += len(line)
+            # Cut off a line torn by the crash before appending after it
+            with open(path, "r+b") as f:
+                f.truncate(good_bytes)
+        self.file = open(path, "a" if resume else "w")
+
+    def append(self, ein, **records):
+        """Record one finished EIN, e.g. append(ein, ceo=[...], financial=[...])"""
+        self.file.write(json.dumps({"ein": ein, **records}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.completed[ein] = records
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def scrape_eins(ein_list, parse, args_for, placeholder, fields, checkpoint=None, processes=1, **fetch_options):
+    """Fetch and parse the organization page of each EIN, checkpointing every finished one.
+    Args:
+        ein_list (list): EINs to scrape.
+        parse (callable): Module-level page parser, called as parse(content, *args_for(ein)).
+        args_for (callable): Maps an EIN to the remaining arguments of parse.
+        placeholder (callable): Maps an EIN to the records used when its page
+            can't be fetched or parsed. Those aren't checkpointed, so a resumed
+            run tries the EIN again.
+        fields (tuple): Checkpoint field of each list of records parse returns,
+            e.g. ('ceo',), or ('ceo', 'financial') when it returns a pair.
+        checkpoint (CheckpointLog, optional): Log each finished EIN's records are
+            appended to. EINs already in it are taken from it instead of fetched.
+        processes (int): Worker processes parsing pages while later ones download.
+        **fetch_options: max_workers, requests_per_second and cache, passed to
+            fetching.fetch_pages.
+    Returns:
+        dict: {ein: records}, as parse returns them.
+    """
+    records_by_ein = {}
+    if checkpoint is not None:
+        for ein in ein_list:
+            if ein in checkpoint.completed:
+                entry = checkpoint.completed[ein]
+                records = tuple(entry[field] for field in fields)
+                records_by_ein[ein] = records if len(fields) > 1 else records[0]
+        if records_by_ein:
+            print(f"Resuming: {len(records_by_ein)} EINs already finished in {checkpoint.path}")
+
+    # Pages are fetched concurrently over one keep-alive session, parsed in
+    # worker processes, and handed back here in input order
+    pages = fetch_pages([ein for ein in ein_list if ein not in records_by_ein],
+                        lambda ein: PROPUBLICA_ORG_URL.format(ein=ein), **fetch_options)
+    for ein, records, error, output in parse_pages(pages, parse, args_for, processes=processes):
+        print(f"Processing EIN: {ein}")
+        print(output, end="")
+        if error:
+            print(f"Error processing EIN {ein}: {error}")
+            records_by_ein[ein] = placeholder(ein)
+            continue
+        records_by_ein[ein] = records
+        if checkpoint is not None:
+            checkpoint.append(ein, **dict(zip(fields, records if len(fields) > 1 else (records,))))
+    return records_by_ein
+
+
+def add_scraper_arguments(parser, incremental_help):
+    """Add the shared --workers / --rate / --parser / --incremental / --processes / --resume options to a scraper script"""
+    parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent page fetches")
+    parser.add_argument('--rate', type=float, default=2.0, help="Average requests started per second")
+    parser.add_argument('--parser', choices=HTML_PARSERS, default=DEFAULT_HTML_PARSER, help="HTML parser backend")
+    parser.add_argument('--incremental', action='store_true', help=incremental_help)
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="Worker processes for page parsing")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip EINs finished by an interrupted run, as recorded in its checkpoint log")
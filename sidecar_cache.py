@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+# pandas and pyarrow are imported inside the functions that need them, so the
+# dashboard's startup path can import this module before they are loaded
+
+# Sidecar files live next to the workbook so every server process can reuse them
+SIDECAR_DIR = ".sidecar_cache"
+SIDECAR_META_KEY = b"cu_dashboard.sidecar"
+
+
+def sidecar_path(workbook_path, sheet_name, cache_dir=None):
+    """Return the Parquet sidecar path for one sheet of a workbook"""
+    workbook_path = os.path.abspath(workbook_path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(workbook_path), SIDECAR_DIR)
+    base = os.path.basename(workbook_path)
+    return os.path.join(cache_dir, f"{base}.{sheet_name}.parquet")
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_sidecar_key(path):
+    """Read the cache key stored in a sidecar's schema metadata without loading its data"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    raw = metadata.get(SIDECAR_META_KEY)
+    return json.loads(raw) if raw else None
+
+
+def write_sidecar(table, path, key):
+    """Write a table with its cache key atomically, so readers never see a partial file"""
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SIDECAR_META_KEY] = json.dumps(key).encode()
+    table = table.replace_schema_metadata(metadata)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_excel_sheet(workbook_path, sheet_name, dtype=None, cache_dir=None):
+    """Read one sheet of a workbook through a persistent Parquet sidecar.
+
+    The sidecar is keyed on the workbook's mtime/size and SHA-256 content hash
+    (plus the requested dtypes). When the mtime still matches, the sidecar is
+    read without hashing the workbook; when only the mtime changed but the
+    content hash matches, the stored key is refreshed instead of re-parsing
+    the Excel file. openpyxl only runs when the workbook content changed.
+
+    Args:
+        workbook_path (str): Path to the .xlsx workbook.
+        sheet_name (str): Sheet to read.
+        dtype (dict, optional): Column dtypes, passed to pd.read_excel.
+        cache_dir (str, optional): Directory for sidecar files.
+    Returns:
+        pd.DataFrame: Contents of the sheet.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = sidecar_path(workbook_path, sheet_name, cache_dir)
+    stat = os.stat(workbook_path)
+    dtype_key = {col: str(t) for col, t in (dtype or {}).items()}
+    stored = read_sidecar_key(path)
+
+    if stored and stored.get("dtype") == dtype_key:
+        # Fast path: workbook untouched since the sidecar was written
+        if stored.get("mtime_ns") == stat.st_mtime_ns and stored.get("size") == stat.st_size:
+            return pd.read_parquet(path)
+    digest = file_digest(workbook_path)
+    key = {
+        "sheet": sheet_name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        "dtype": dtype_key,
+    }
+
+    if stored and stored.get("dtype") == dtype_key and stored.get("sha256") == digest:
+        # Workbook was touched (copied, checked out) but not changed: refresh the key
+        table = pq.read_table(path)
+        write_sidecar(table, path, key)
+        return table.to_pandas()
+
+    df = pd.read_excel(workbook_path, sheet_name=sheet_name, dtype=dtype)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except pa.ArrowException as e:
+        # e.g. an object column mixing numbers and text; serve the parsed
+        # sheet and leave it uncached rather than failing the load
+        print(f"Not caching sheet {sheet_name!r} of {workbook_path}: {e}")
+        return df
+    write_sidecar(table, path, key)
+    return df